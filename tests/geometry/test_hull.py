@@ -1,11 +1,32 @@
+import json
 import pytest
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from thermocore.geometry.hull import (
     barycentric_coordinates,
+    chemical_potential_ground_states,
+    chemical_potential_stability_halfspaces,
+    disable_hull_cache,
+    enable_hull_cache,
+    binary_lower_hull,
+    ensemble_ground_states,
+    ensemble_hull_distances,
+    full_hull,
+    lower_envelope_hull,
+    prefilter_hull_points,
+    reference_hull_distance_correlations,
+    batch_barycentric_coordinates,
     hull_distance_correlations,
+    hull_distance_operator,
+    hull_distance_weights,
+    inside_convex_hull,
     lower_hull,
     simplex_energy_equation_matrix,
     lower_hull_simplex_containing,
+    lower_hull_energies,
+    lower_hull_distances,
+    lower_hull_decomposition,
+    LowerHull,
 )
 from tests.geometry.binary import (
     binary_points,
@@ -19,6 +40,22 @@ from tests.geometry.binary import (
 )
 
 
+@pytest.fixture
+def coplanar_quaternary():
+    """Quaternary grid with rounded energies, whose coplanar lower facets Qhull triangulates into simplices including zero volume ones."""
+    rng = np.random.default_rng(0)
+    grid = np.stack(np.meshgrid(*[np.arange(11) / 10] * 3, indexing="ij"), -1)
+    compositions = grid.reshape(-1, 3)
+    compositions = compositions[np.sum(compositions, axis=1) <= 1 + 1e-9]
+    fractions = np.c_[compositions, 1 - np.sum(compositions, axis=1)]
+    energies = np.round(
+        -np.sum(fractions * (1 - fractions), axis=1)
+        * (1 + rng.random(len(compositions))),
+        2,
+    )
+    return compositions, energies
+
+
 def test_lower_hull_binary(
     binary_points,
     binary_hull,
@@ -38,6 +75,28 @@ def test_lower_hull_binary(
     assert simplices_result_set == simplices_expected_set
 
 
+def test_binary_lower_hull(
+    binary_points, binary_hull, binary_lower_hull_vertex_indices
+):
+    """Tests the monotone chain binary_lower_hull and the binary fast paths against Qhull for binary data."""
+    vertices = binary_lower_hull(binary_points[:, :-1], binary_points[:, -1])
+    assert set(vertices) == set(binary_lower_hull_vertex_indices)
+    assert np.all(np.diff(binary_points[vertices, 0]) > 0)
+
+    assert np.allclose(
+        lower_hull_distances(binary_points[:, :-1], binary_points[:, -1]),
+        lower_hull_distances(binary_points[:, :-1], binary_points[:, -1], binary_hull),
+    )
+    test_points = np.linspace(0, 9, 37)
+    searchsorted_result = lower_hull_simplex_containing(
+        test_points, binary_hull, method="searchsorted"
+    )
+    argmax_result = lower_hull_simplex_containing(
+        test_points, binary_hull, method="argmax"
+    )
+    assert np.allclose(searchsorted_result[1], argmax_result[1])
+
+
 def test_simplex_energy_equation_matrix_binary(
     binary_hull, binary_lower_hull_simplex_indices
 ):
@@ -102,6 +161,54 @@ def test_barycentric_coordinates_1D():
                 assert np.allclose(coordinates, np.array([x1, x2]))
 
 
+def test_batch_barycentric_coordinates_2D():
+    """Tests batch_barycentric_coordinates against barycentric_coordinates for points in two dimensions,
+    with each point assigned to one of several simplices."""
+    rng = np.random.default_rng(0)
+    vertices = rng.random((4, 3, 2))
+    simplex_indices = rng.integers(0, 4, size=50)
+    points = rng.random((50, 2))
+    result = batch_barycentric_coordinates(points, vertices, simplex_indices)
+    expected = np.array(
+        [
+            barycentric_coordinates(point, vertices[simplex_index])
+            for point, simplex_index in zip(points, simplex_indices)
+        ]
+    )
+    assert result.shape == (50, 3)
+    assert np.allclose(result, expected)
+    assert np.allclose(np.sum(result, axis=1), 1)
+
+
+def test_batch_barycentric_coordinates_single_simplex():
+    """Tests batch_barycentric_coordinates with a single simplex shared by all points."""
+    points = np.array([[0.0], [0.25], [1.0]])
+    result = batch_barycentric_coordinates(points, np.array([[0.0], [1.0]]))
+    assert np.allclose(result, np.array([[1.0, 0.0], [0.75, 0.25], [0.0, 1.0]]))
+
+
+def test_inside_convex_hull_2D():
+    """Tests inside_convex_hull for points in a triangle, including points on its boundary."""
+    points = np.array([[0, 0], [1, 0], [0, 1], [0.2, 0.2]], dtype=float)
+    test_points = np.array(
+        [[0.1, 0.1], [0.5, 0.5], [0, 0], [1, 0], [0.6, 0.6], [-0.1, 0.5], [0.5, -0.1]]
+    )
+    result = inside_convex_hull(points, test_points)
+    assert isinstance(result, np.ndarray)
+    assert np.array_equal(
+        result, np.array([True, True, True, True, False, False, False])
+    )
+
+
+def test_inside_convex_hull_degenerate():
+    """Tests inside_convex_hull for points lying on a line in two dimensions,
+    which should fall back on linear programming."""
+    points = np.array([[0, 0], [1, 1], [2, 2]], dtype=float)
+    test_points = np.array([[0.5, 0.5], [2, 2], [1, 0], [3, 3]])
+    result = inside_convex_hull(points, test_points)
+    assert np.array_equal(result, np.array([True, True, False, False]))
+
+
 def test_hull_correlation_calculator(
     ZrN_FCC_corr_subset, ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
 ):
@@ -116,4 +223,724 @@ def test_hull_correlation_calculator(
     assert np.allclose(hullcorr[precalculated_lower_hull_indices], 0)
 
 
+def test_hull_correlation_calculator_matches_per_configuration(
+    ZrN_FCC_corr_subset, ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests that 'hull_distance_correlations' matches a configuration-by-configuration calculation."""
+    hull = full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+    hullcorr = hull_distance_correlations(
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_formation_energy_subset,
+        hull=hull,
+    )
+    simplex_indices, _ = lower_hull_simplex_containing(ZrN_FCC_composition_subset, hull)
+    for config_index, simplex_index in enumerate(simplex_indices):
+        weights = barycentric_coordinates(
+            ZrN_FCC_composition_subset[config_index],
+            ZrN_FCC_composition_subset[hull.simplices[simplex_index]],
+        )
+        expected = (
+            ZrN_FCC_corr_subset[config_index]
+            - weights @ ZrN_FCC_corr_subset[hull.simplices[simplex_index]]
+        )
+        assert np.allclose(hullcorr[config_index], expected)
+
+
+def test_lower_hull_object_binary(
+    binary_points, binary_hull, binary_lower_hull_vertex_indices
+):
+    """Tests LowerHull queries for binary data against the hull functions."""
+    lower = LowerHull(binary_points[:, :-1], binary_points[:, -1])
+    assert set(lower.vertex_indices) == set(binary_lower_hull_vertex_indices)
+
+    test_points = np.array([0, 0.5, 1, 3, 5, 7.5, 9])
+    expected_energies = [8, 4.5, 1, 0.5, 0, 1.25, 2]
+    assert np.allclose(lower.energies(test_points), expected_energies)
+    assert np.allclose(
+        lower.energies(test_points), lower_hull_energies(test_points, binary_hull)
+    )
+    assert np.allclose(
+        lower.distances(binary_points[:, :-1], binary_points[:, -1]),
+        binary_points[:, -1] - lower_hull_energies(binary_points[:, :-1], binary_hull),
+    )
+
+    simplex_indices, _ = lower.containing_simplex(test_points)
+    vertex_indices, fractions = lower.decompose(test_points)
+    assert np.array_equal(vertex_indices, lower.simplices[simplex_indices])
+    assert np.allclose(np.sum(fractions, axis=1), 1)
+    assert np.all(fractions > -1e-12)
+    assert np.allclose(
+        np.sum(fractions * binary_points[vertex_indices, 0], axis=1), test_points
+    )
+
+    with pytest.raises(ValueError):
+        lower.energies(np.array([9.5]))
+
+
+def test_lower_hull_object_from_convex_hull(binary_hull):
+    """Tests that LowerHull built from an existing convex hull matches one built from points."""
+    lower = LowerHull.from_convex_hull(binary_hull)
+    lower_from_points = LowerHull(binary_hull.points[:, :-1], binary_hull.points[:, -1])
+    test_points = np.linspace(0, 9, 20)
+    assert np.allclose(
+        lower.energies(test_points), lower_from_points.energies(test_points)
+    )
+
+
+def test_lower_hull_object_save_load(tmp_path):
+    """Tests that a saved and memory mapped lower hull answers queries like the original."""
+    rng = np.random.default_rng(0)
+    compositions = np.vstack(
+        (rng.dirichlet([1, 1, 1], size=200), [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    )
+    energies = rng.normal(size=len(compositions)) - np.sum(compositions**2, axis=1)
+    lower = LowerHull(compositions, energies)
+    lower.save(tmp_path / "hull")
+    loaded = LowerHull.load(tmp_path / "hull")
+    assert loaded.convex_hull is None
+    assert isinstance(loaded.equation_matrix, np.memmap)
+
+    test_points = rng.dirichlet([1, 1, 1], size=100)
+    assert np.allclose(loaded.energies(test_points), lower.energies(test_points))
+    assert np.allclose(loaded.hull_distances(), lower.hull_distances())
+    for loaded_values, values in zip(
+        loaded.decompose(test_points), lower.decompose(test_points)
+    ):
+        assert np.allclose(loaded_values, values)
+    with pytest.raises(ValueError):
+        loaded.energies(np.array([[0.5, 0.6, 0.1]]))
+    with pytest.raises(RuntimeError):
+        loaded.add_points(test_points[:1], np.zeros(1))
+
+    # Saving over a mapped hull replaces its files, leaving the mapped hull intact
+    expected = loaded.energies(test_points)
+    LowerHull(compositions, energies + 1).save(tmp_path / "hull")
+    assert np.allclose(loaded.energies(test_points), expected)
+    assert np.allclose(
+        LowerHull.load(tmp_path / "hull").energies(test_points), expected + 1
+    )
+
+    manifest = tmp_path / "hull" / "manifest.json"
+    assert {file.name for file in manifest.parent.iterdir()} == set(
+        json.loads(manifest.read_text())["arrays"].values()
+    ) | {"manifest.json"}
+    manifest.write_text(
+        manifest.read_text().replace('"format_version": 2', '"format_version": 3')
+    )
+    with pytest.raises(ValueError):
+        LowerHull.load(tmp_path / "hull")
+
+    # Processes saving to one directory at once leave a readable hull
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(loaded.save, [tmp_path / "shared"] * 16))
+    assert np.allclose(
+        LowerHull.load(tmp_path / "shared").energies(test_points), expected
+    )
+
+
+def test_lower_hull_object_degenerate_simplices(coplanar_quaternary):
+    """Tests that LowerHull and functions built on it handle zero volume lower hull simplices."""
+    compositions, energies = coplanar_quaternary
+    lower = LowerHull(compositions, energies)
+    degenerate = np.isnan(lower.transforms[:, 0, 0])
+    assert degenerate.any()
+    assert np.allclose(
+        lower.hull_distances(), lower_hull_distances(compositions, energies)
+    )
+    simplex_indices = lower.containing_simplex(compositions)[0]
+    assert not degenerate[simplex_indices].any()
+    _, fractions = lower.decompose(compositions)
+    assert np.all(np.isfinite(fractions))
+
+    corr = np.c_[np.ones(len(compositions)), compositions]
+    assert np.allclose(
+        reference_hull_distance_correlations(
+            corr, compositions, corr, compositions, energies
+        ),
+        hull_distance_correlations(corr, compositions, energies),
+    )
+    kept = prefilter_hull_points(compositions, energies, prune=True)
+    assert set(lower.vertex_indices) <= set(kept)
+
+
+def test_lower_hull_simplex_containing_walk_ternary():
+    """Tests that locating simplices by walking agrees with the maximum energy simplex for ternary data."""
+    rng = np.random.default_rng(0)
+    compositions = np.vstack(
+        (rng.dirichlet([1, 1, 1], size=500)[:, :2], [[0, 0], [1, 0], [0, 1]])
+    )
+    energies = rng.normal(size=len(compositions)) - np.sum(compositions**2, axis=1)
+    hull = full_hull(compositions, energies)
+    test_points = rng.dirichlet([1, 1, 1], size=1000)[:, :2]
+    walk_simplices, walk_energies = lower_hull_simplex_containing(
+        test_points, hull, method="walk"
+    )
+    argmax_simplices, argmax_energies = lower_hull_simplex_containing(
+        test_points, hull, method="argmax"
+    )
+    assert np.allclose(walk_energies, argmax_energies)
+    assert np.allclose(
+        lower_hull_simplex_containing(test_points, hull)[1], walk_energies
+    )
+    assert np.allclose(
+        LowerHull.from_convex_hull(hull).containing_simplex(test_points)[1],
+        walk_energies,
+    )
+    with pytest.raises(ValueError):
+        lower_hull_simplex_containing(test_points, hull, method="bisect")
+
+    # Walk energies should lie on the simplices that were found
+    equation_matrix = simplex_energy_equation_matrix(hull, walk_simplices)
+    assert np.allclose(
+        walk_energies,
+        np.sum(equation_matrix[:, :-1] * test_points, axis=1) + equation_matrix[:, -1],
+    )
+
+
+def test_lower_hull_simplex_containing_degenerate_simplices(coplanar_quaternary):
+    """Tests point location on lower hulls with zero volume simplices, which have no barycentric transform."""
+    compositions, energies = coplanar_quaternary
+    hull = full_hull(compositions, energies)
+    simplex_indices = lower_hull(hull)[1]
+    volumes = np.abs(
+        np.linalg.det(
+            np.concatenate(
+                (
+                    hull.points[hull.simplices[simplex_indices], :-1],
+                    np.ones((len(simplex_indices), 4, 1)),
+                ),
+                axis=2,
+            )
+        )
+    )
+    assert np.any(volumes < 1e-12) and len(simplex_indices) > 64
+
+    test_points = np.random.default_rng(1).dirichlet([1, 1, 1, 1], size=500)[:, :3]
+    test_points = np.vstack((test_points, compositions))
+    walk_simplices, walk_energies = lower_hull_simplex_containing(
+        test_points, hull, method="walk"
+    )
+    argmax_simplices, argmax_energies = lower_hull_simplex_containing(
+        test_points, hull, method="argmax"
+    )
+    assert np.allclose(walk_energies, argmax_energies)
+    assert not np.isin(walk_simplices, simplex_indices[volumes < 1e-12]).any()
+    assert not np.isin(argmax_simplices, simplex_indices[volumes < 1e-12]).any()
+    assert np.all(lower_hull_distances(compositions, energies) >= -1e-12)
+
+    vertex_indices, fractions = lower_hull_decomposition(test_points, hull)
+    assert np.allclose(
+        np.einsum("ni,nij->nj", fractions, hull.points[vertex_indices, :-1]),
+        test_points,
+    )
+
+
+def test_lower_hull_distances_chunked(
+    ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests that processing points in chunks gives the same hull distances as processing them all at once."""
+    expected = lower_hull_distances(
+        ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+    )
+    for chunk_size in [1, 4, 100]:
+        result = lower_hull_distances(
+            ZrN_FCC_composition_subset,
+            ZrN_FCC_formation_energy_subset,
+            chunk_size=chunk_size,
+        )
+        assert np.allclose(result, expected)
+    lower = LowerHull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+    assert np.allclose(
+        lower.distances(
+            ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset, chunk_size=5
+        ),
+        expected,
+    )
+
+
+def test_lower_hull_energies_chunked_quaternary(coplanar_quaternary):
+    """Tests chunked lower hull energies on a hull with many simplices, with and without known simplex indices."""
+    compositions, energies = coplanar_quaternary
+    hull = full_hull(compositions, energies)
+    test_points = np.random.default_rng(2).dirichlet([1, 1, 1, 1], size=300)[:, :3]
+    expected = lower_hull_energies(test_points, hull)
+    simplex_indices = lower_hull(hull)[1]
+    for known_simplex_indices in [None, simplex_indices]:
+        assert np.allclose(
+            lower_hull_energies(test_points, hull, known_simplex_indices, chunk_size=7),
+            expected,
+        )
+
+
+def test_lower_hull_object_add_points():
+    """Tests that adding points to an incremental LowerHull matches building the hull from all points,
+    and that the reported simplex changes are consistent."""
+    rng = np.random.default_rng(1)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=200)[:, :2])
+    )
+    energies = rng.normal(size=len(compositions)) - np.sum(compositions**2, axis=1)
+    energies[:3] = 0
+
+    lower = LowerHull(compositions[:150], energies[:150], incremental=True)
+    previous_simplices = {frozenset(simplex) for simplex in lower.simplices}
+    lower.hull_distances()
+    removed_simplices, added_simplices = lower.add_points(
+        compositions[150:], energies[150:]
+    )
+    current_simplices = {frozenset(simplex) for simplex in lower.simplices}
+
+    assert {frozenset(simplex) for simplex in removed_simplices} == (
+        previous_simplices - current_simplices
+    )
+    assert {frozenset(simplex) for simplex in added_simplices} == (
+        current_simplices - previous_simplices
+    )
+    expected = LowerHull(compositions, energies)
+    assert np.allclose(
+        lower.hull_distances(), expected.distances(compositions, energies)
+    )
+
+
+def test_lower_envelope_hull_ternary():
+    """Tests that lower_envelope_hull has the same lower hull as full_hull for ternary data, including coplanar facets."""
+    rng = np.random.default_rng(2)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=300)[:, :2])
+    )
+    energies = rng.exponential(size=len(compositions)) - np.sum(compositions**2, axis=1)
+    hull = full_hull(compositions, energies)
+    envelope = lower_envelope_hull(compositions, energies)
+    assert len(envelope.points) == len(compositions) + 1
+
+    vertices, simplex_indices = lower_hull(hull)
+    envelope_vertices, envelope_simplex_indices = lower_hull(envelope)
+    assert np.array_equal(vertices, envelope_vertices)
+    assert {frozenset(simplex) for simplex in hull.simplices[simplex_indices]} == {
+        frozenset(simplex) for simplex in envelope.simplices[envelope_simplex_indices]
+    }
+    assert np.allclose(
+        lower_hull_distances(compositions, energies, envelope),
+        lower_hull_distances(compositions, energies, hull),
+    )
+    lower = LowerHull.from_convex_hull(envelope)
+    assert len(lower.point_energies) == len(compositions)
+    assert np.allclose(
+        lower.hull_distances(), lower_hull_distances(compositions, energies, hull)
+    )
+    assert not lower.inside_bounds(np.array([[0.6, 0.6]]))[0]
+
+    # Coplanar lower facets may be triangulated differently, but vertices and energies agree
+    grid = np.stack(np.meshgrid(*[np.arange(21) / 20] * 2, indexing="ij"), -1)
+    compositions = grid.reshape(-1, 2)
+    compositions = compositions[np.sum(compositions, axis=1) <= 1 + 1e-9]
+    energies = np.round(
+        -np.sum(compositions * (1 - compositions), axis=1)
+        * (1 + rng.random(len(compositions))),
+        1,
+    )
+    hull = full_hull(compositions, energies)
+    envelope = lower_envelope_hull(compositions, energies)
+    assert np.array_equal(lower_hull(hull)[0], lower_hull(envelope)[0])
+    assert np.allclose(
+        lower_hull_distances(compositions, energies, envelope),
+        lower_hull_distances(compositions, energies, hull),
+    )
+    vertex_indices, fractions = lower_hull_decomposition(compositions, envelope)
+    assert np.allclose(
+        np.einsum("ni,nij->nj", fractions, envelope.points[vertex_indices, :-1]),
+        compositions,
+    )
+
+
+def test_ensemble_hull_distances(
+    ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests that ensemble_hull_distances matches lower_hull_distances for each sample, serially and in parallel."""
+    rng = np.random.default_rng(3)
+    energies = ZrN_FCC_formation_energy_subset + 0.01 * rng.normal(
+        size=(6, len(ZrN_FCC_formation_energy_subset))
+    )
+    expected = np.vstack(
+        [
+            lower_hull_distances(ZrN_FCC_composition_subset, sample_energies)
+            for sample_energies in energies
+        ]
+    )
+    result = ensemble_hull_distances(ZrN_FCC_composition_subset, energies)
+    assert result.shape == energies.shape
+    assert np.allclose(result, expected)
+    assert np.allclose(
+        ensemble_hull_distances(ZrN_FCC_composition_subset, energies, n_workers=2),
+        expected,
+    )
+
+    # Redundant composition axes are projected once for all samples
+    redundant_compositions = np.hstack(
+        (ZrN_FCC_composition_subset, 1 - ZrN_FCC_composition_subset)
+    )
+    assert np.allclose(
+        ensemble_hull_distances(redundant_compositions, energies, n_workers=2),
+        expected,
+    )
+
+
+def test_ensemble_ground_states(
+    ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests ensemble_ground_states against lower hull vertices found sample by sample."""
+    reference_vertices, _ = lower_hull(
+        full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+    )
+    rng = np.random.default_rng(4)
+    energies = np.vstack(
+        (
+            ZrN_FCC_formation_energy_subset,
+            ZrN_FCC_formation_energy_subset
+            + 0.02 * rng.normal(size=(5, len(ZrN_FCC_formation_energy_subset))),
+        )
+    )
+    vertex_frequencies, n_missing, n_spurious = ensemble_ground_states(
+        ZrN_FCC_composition_subset, energies, reference_vertices
+    )
+
+    sample_vertices = [
+        set(lower_hull(full_hull(ZrN_FCC_composition_subset, sample_energies))[0])
+        for sample_energies in energies
+    ]
+    expected_frequencies = np.array(
+        [
+            np.mean([index in vertices for vertices in sample_vertices])
+            for index in range(len(ZrN_FCC_formation_energy_subset))
+        ]
+    )
+    assert np.allclose(vertex_frequencies, expected_frequencies)
+    assert np.array_equal(
+        n_missing,
+        [len(set(reference_vertices) - vertices) for vertices in sample_vertices],
+    )
+    assert np.array_equal(
+        n_spurious,
+        [len(vertices - set(reference_vertices)) for vertices in sample_vertices],
+    )
+    assert n_missing[0] == 0 and n_spurious[0] == 0
+
+
+def test_full_hull_degenerate_compositions(
+    ZrN_FCC_corr_subset, ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests that hulls of compositions with a redundant composition axis match hulls of the reduced compositions."""
+    redundant_compositions = np.hstack(
+        (ZrN_FCC_composition_subset, 1 - ZrN_FCC_composition_subset)
+    )
+    hull = full_hull(redundant_compositions, ZrN_FCC_formation_energy_subset)
+    assert hull.points.shape == (len(ZrN_FCC_composition_subset), 2)
+    assert set(lower_hull(hull)[0]) == set(
+        lower_hull(
+            full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+        )[0]
+    )
+
+    expected_distances = lower_hull_distances(
+        ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+    )
+    assert np.allclose(
+        lower_hull_distances(redundant_compositions, ZrN_FCC_formation_energy_subset),
+        expected_distances,
+    )
+    lower = LowerHull(redundant_compositions, ZrN_FCC_formation_energy_subset)
+    assert np.allclose(lower.hull_distances(), expected_distances)
+    assert np.allclose(
+        hull_distance_correlations(
+            ZrN_FCC_corr_subset, redundant_compositions, ZrN_FCC_formation_energy_subset
+        ),
+        hull_distance_correlations(
+            ZrN_FCC_corr_subset,
+            ZrN_FCC_composition_subset,
+            ZrN_FCC_formation_energy_subset,
+        ),
+    )
+
+    # Points off the composition subspace are out of bounds
+    with pytest.raises(ValueError):
+        lower_hull_energies(np.array([[0.5, 0.6]]), hull)
+
+
+def test_hull_distance_weights_and_operator(
+    ZrN_FCC_corr_subset, ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests that the sparse weight matrix and the lazy operator reproduce the dense hull distance correlations."""
+    hullcorr = hull_distance_correlations(
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_formation_energy_subset,
+    )
+    weights = hull_distance_weights(
+        ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+    )
+    assert weights.shape == (len(ZrN_FCC_corr_subset), len(ZrN_FCC_corr_subset))
+    assert weights.nnz <= 2 * len(ZrN_FCC_corr_subset)
+    assert np.allclose(ZrN_FCC_corr_subset - weights @ ZrN_FCC_corr_subset, hullcorr)
+
+    operator = hull_distance_operator(
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_formation_energy_subset,
+    )
+    rng = np.random.default_rng(5)
+    eci = rng.normal(size=ZrN_FCC_corr_subset.shape[1])
+    hull_distances = rng.normal(size=ZrN_FCC_corr_subset.shape[0])
+    assert np.allclose(operator.matvec(eci), hullcorr @ eci)
+    assert np.allclose(operator.rmatvec(hull_distances), hullcorr.T @ hull_distances)
+
+
+def test_prefilter_hull_points_ternary():
+    """Tests that prefiltering keeps every lower hull vertex and one point per composition,
+    and that hull distances are unchanged."""
+    rng = np.random.default_rng(6)
+    distinct_compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=100)[:, :2])
+    )
+    compositions = distinct_compositions[rng.integers(0, 103, size=2000)]
+    compositions[:103] = distinct_compositions
+    energies = rng.normal(size=len(compositions)) - np.sum(compositions**2, axis=1)
+
+    vertices, _ = lower_hull(full_hull(compositions, energies))
+    kept = prefilter_hull_points(compositions, energies)
+    assert len(kept) == 103
+    assert set(vertices) <= set(kept)
+    pruned = prefilter_hull_points(compositions, energies, prune=True)
+    assert set(vertices) <= set(pruned) <= set(kept)
+
+    assert np.allclose(
+        lower_hull_distances(compositions, energies, prefilter=True),
+        lower_hull_distances(compositions, energies),
+    )
+
+
+def test_lower_hull_object_vertex_depths():
+    """Tests LowerHull.vertex_depths against rebuilding the hull without each vertex for ternary data."""
+    rng = np.random.default_rng(7)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=300)[:, :2])
+    )
+    energies = rng.exponential(size=len(compositions)) - 2 * np.sum(
+        compositions * (1 - compositions), axis=1
+    )
+    energies[:3] = 0
+    lower = LowerHull(compositions, energies)
+    depths = lower.vertex_depths()
+    assert len(depths) == len(lower.vertex_indices)
+
+    for vertex, depth in zip(lower.vertex_indices, depths):
+        if vertex < 3:
+            # Pure components cannot be expressed by the remaining points
+            assert np.isnan(depth)
+            continue
+        remaining = np.arange(len(compositions)) != vertex
+        expected = (
+            lower_hull_energies(
+                compositions[vertex : vertex + 1],
+                full_hull(compositions[remaining], energies[remaining]),
+            )[0]
+            - energies[vertex]
+        )
+        assert np.isclose(depth, expected)
+        assert depth >= 0
+
+
+def test_lower_hull_object_vertex_depths_all_vertices():
+    """Tests LowerHull.vertex_depths when every point is a lower hull vertex, such that stars hold no other points."""
+    assert np.allclose(
+        LowerHull([0, 0.25, 0.5, 0.75, 1], [0, -0.3, -0.5, -0.3, 0]).vertex_depths(),
+        [np.nan, 0.05, 0.2, 0.05, np.nan],
+        equal_nan=True,
+    )
+
+    rng = np.random.default_rng(3)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=100)[:, :2])
+    )
+    energies = np.sum(compositions**2, axis=1) + np.sum(compositions, axis=1) ** 2
+    lower = LowerHull(compositions, energies)
+    assert len(lower.vertex_indices) == len(compositions)
+    depths = lower.vertex_depths()
+    for vertex, depth in zip(lower.vertex_indices, depths):
+        if vertex < 3:
+            assert np.isnan(depth)
+            continue
+        remaining = np.arange(len(compositions)) != vertex
+        expected = (
+            lower_hull_energies(
+                compositions[vertex : vertex + 1],
+                full_hull(compositions[remaining], energies[remaining]),
+            )[0]
+            - energies[vertex]
+        )
+        assert np.isclose(depth, expected)
+
+
+def test_chemical_potential_ground_states_ternary():
+    """Tests chemical potential ground states and stability regions against a minimum over all points for ternary data."""
+    rng = np.random.default_rng(8)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=200)[:, :2])
+    )
+    energies = rng.exponential(size=len(compositions)) - 2 * np.sum(
+        compositions * (1 - compositions), axis=1
+    )
+    chemical_potentials = rng.uniform(-3, 3, size=(5000, 2))
+
+    ground_states = chemical_potential_ground_states(
+        compositions, energies, chemical_potentials, chunk_size=1000
+    )
+    grand_canonical_energies = energies - chemical_potentials @ compositions.T
+    assert np.allclose(
+        grand_canonical_energies[np.arange(len(chemical_potentials)), ground_states],
+        np.min(grand_canonical_energies, axis=1),
+    )
+
+    vertex_indices, halfspaces = chemical_potential_stability_halfspaces(
+        compositions, energies
+    )
+    vertex_positions = np.searchsorted(vertex_indices, ground_states)
+    for chemical_potential, position in zip(chemical_potentials, vertex_positions):
+        vertex_halfspaces = halfspaces[position]
+        assert np.all(
+            vertex_halfspaces[:, :-1] @ chemical_potential + vertex_halfspaces[:, -1]
+            <= 1e-10
+        )
+
+
+def test_lower_hull_decomposition_ternary():
+    """Tests that lower_hull_decomposition reproduces compositions and hull energies for ternary data."""
+    rng = np.random.default_rng(9)
+    compositions = np.vstack(
+        ([[0, 0], [1, 0], [0, 1]], rng.dirichlet([1, 1, 1], size=200)[:, :2])
+    )
+    energies = rng.exponential(size=len(compositions)) - 2 * np.sum(
+        compositions * (1 - compositions), axis=1
+    )
+    hull = full_hull(compositions, energies)
+    test_points = rng.dirichlet([1, 1, 1], size=500)[:, :2]
+
+    vertex_indices, fractions = lower_hull_decomposition(test_points, hull)
+    assert vertex_indices.shape == fractions.shape == (500, 3)
+    assert set(np.unique(vertex_indices)) <= set(lower_hull(hull)[0])
+    assert np.all(fractions > -1e-10)
+    assert np.allclose(np.sum(fractions, axis=1), 1)
+    assert np.allclose(
+        np.einsum("ij,ijk->ik", fractions, compositions[vertex_indices]), test_points
+    )
+    assert np.allclose(
+        np.sum(fractions * energies[vertex_indices], axis=1),
+        lower_hull_energies(test_points, hull),
+    )
+
+    lower = LowerHull(compositions, energies)
+    lower_vertex_indices, lower_fractions = lower.decompose(test_points)
+    assert np.allclose(
+        np.sum(lower_fractions * energies[lower_vertex_indices], axis=1),
+        lower_hull_energies(test_points, hull),
+    )
+
+
+def test_reference_hull_distance_correlations(
+    ZrN_FCC_corr_subset, ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+):
+    """Tests hull correlations of configurations evaluated against a separate reference hull."""
+    # Evaluating the reference configurations themselves matches hull_distance_correlations
+    expected = hull_distance_correlations(
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_formation_energy_subset,
+    )
+    result = reference_hull_distance_correlations(
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_corr_subset,
+        ZrN_FCC_composition_subset,
+        ZrN_FCC_formation_energy_subset,
+        chunk_size=5,
+    )
+    assert np.allclose(result, expected)
+
+    # Held out configurations, evaluated against the hull of the remaining configurations
+    held_out = np.arange(2, 21)
+    reference = np.setdiff1d(np.arange(len(ZrN_FCC_corr_subset)), held_out)
+    result = reference_hull_distance_correlations(
+        ZrN_FCC_corr_subset[held_out],
+        ZrN_FCC_composition_subset[held_out],
+        ZrN_FCC_corr_subset[reference],
+        ZrN_FCC_composition_subset[reference],
+        ZrN_FCC_formation_energy_subset[reference],
+    )
+    vertex_indices, fractions = lower_hull_decomposition(
+        ZrN_FCC_composition_subset[held_out],
+        full_hull(
+            ZrN_FCC_composition_subset[reference],
+            ZrN_FCC_formation_energy_subset[reference],
+        ),
+    )
+    assert np.allclose(
+        result,
+        ZrN_FCC_corr_subset[held_out]
+        - np.einsum(
+            "ij,ijk->ik", fractions, ZrN_FCC_corr_subset[reference][vertex_indices]
+        ),
+    )
+
+
+def test_hull_cache(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset):
+    """Tests that the hull cache reuses hulls of identical inputs, and evicts least recently used hulls."""
+    cache = enable_hull_cache(max_entries=2)
+    try:
+        first = full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+        second = full_hull(
+            ZrN_FCC_composition_subset.copy(), ZrN_FCC_formation_energy_subset.copy()
+        )
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.n_bytes > 0
+
+        # Different energies or Qhull options are different entries
+        shifted = full_hull(
+            ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset + 1e-3
+        )
+        assert shifted is not first
+        full_hull(
+            ZrN_FCC_composition_subset,
+            ZrN_FCC_formation_energy_subset,
+            qhull_options="Qt",
+        )
+        assert cache.info() == {
+            "hits": 1,
+            "misses": 3,
+            "evictions": 1,
+            "entries": 2,
+            "n_bytes": cache.n_bytes,
+        }
+        assert (
+            full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+            is not first
+        )
+
+        # Intermediate hulls built internally bypass the cache
+        cache.clear()
+        rng = np.random.default_rng(4)
+        compositions = rng.dirichlet([1, 1, 1], size=100)[:, :2]
+        energies = rng.normal(size=len(compositions))
+        lower = LowerHull(compositions, energies)
+        ensemble_hull_distances(compositions, energies + rng.normal(size=(3, 100)))
+        lower.vertex_depths()
+        prefilter_hull_points(compositions, energies, prune=True)
+        assert cache.misses == 1
+    finally:
+        disable_hull_cache()
+    assert full_hull(
+        ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset
+    ) is not full_hull(ZrN_FCC_composition_subset, ZrN_FCC_formation_energy_subset)
+
+
 # TODO: Tests for ternary data
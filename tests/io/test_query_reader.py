@@ -1,5 +1,13 @@
+import json
 import pytest
-from thermocore.io.casm import regroup_query_by_config_property
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from thermocore.io.casm import (
+    QueryTable,
+    read_query_columns,
+    read_query_tables,
+    regroup_query_by_config_property,
+)
 
 
 @pytest.fixture
@@ -47,3 +55,171 @@ def test_query_reader(query_data, expected_query_data):
     """Compare results of casm_query_reader to expected output."""
     query_reader_test = regroup_query_by_config_property(query_data)
     assert query_reader_test == expected_query_data
+
+
+@pytest.mark.parametrize("chunk_size", [7, 2**20])
+def test_read_query_columns(query_data, expected_query_data, tmp_path, chunk_size):
+    """Compare streamed columns to expected output, including when configurations span several reads."""
+    path = tmp_path / "query.json"
+    path.write_text(json.dumps(query_data, indent=2))
+    columns = read_query_columns(path, n_configurations=2, chunk_size=chunk_size)
+    assert columns.keys() == expected_query_data.keys()
+    for key, expected in expected_query_data.items():
+        assert np.array_equal(columns[key], expected)
+    assert columns["corr"].dtype == np.float64
+    assert columns["comp"].shape == (3, 1)
+    assert columns["arbitrary_key"].dtype == np.int64
+
+
+def test_query_table(query_data, expected_query_data):
+    """Tests typed columns, subsetting and dictionary output of QueryTable."""
+    table = QueryTable.from_query_data(query_data, dtype=np.float32)
+    assert len(table) == 3
+    assert table["corr"].dtype == np.float32
+    assert table["corr"] is table.columns["corr"]
+    assert table.to_dict().keys() == expected_query_data.keys()
+    assert table.to_dict()["name"] == expected_query_data["name"]
+    assert np.allclose(table.to_dict()["corr"], expected_query_data["corr"])
+
+    stable = table[table["formation_energy"] < 0]
+    assert stable["name"].tolist() == ["SCEL3"]
+    assert np.shares_memory(table[1:]["comp"], table["comp"])
+    assert table.rows(["SCEL3", "SCEL1"]).tolist() == [2, 0]
+    assert table[-1]["name"] == "SCEL3"
+    assert table[np.int64(0)]["comp"] == [1.0]
+    with pytest.raises(TypeError):
+        table.subset(1)
+    with pytest.raises(KeyError):
+        table.rows(["SCEL4"])
+    assert QueryTable.from_query_data(query_data).to_dict() == expected_query_data
+
+
+@pytest.mark.parametrize("validate", ["stat", "hash"])
+def test_query_table_cache(query_data, expected_query_data, tmp_path, validate):
+    """Tests that cached query tables are memory mapped, reused, and rewritten when the source changes."""
+    for row, configuration in enumerate(query_data):
+        configuration["site_data"] = {"occupation": [row]}
+    path = tmp_path / "query.json"
+    path.write_text(json.dumps(query_data))
+    table = QueryTable.read(path, cache=True, validate=validate)
+    assert isinstance(table["corr"], np.memmap)
+    assert table["site_data"][2] == {"occupation": [2]}
+    assert table["name"].tolist() == expected_query_data["name"]
+
+    manifest = tmp_path / "query.json.cache" / "manifest.json"
+    written = manifest.stat().st_mtime_ns
+    assert QueryTable.read(path, cache=True, validate=validate).to_dict() == (
+        table.to_dict()
+    )
+    assert manifest.stat().st_mtime_ns == written
+
+    query_data[2]["formation_energy"] = -0.4
+    path.write_text(json.dumps(query_data))
+    updated = QueryTable.read(path, cache=True, validate=validate)
+    assert updated["formation_energy"][2] == -0.4
+
+    # Files of the replaced cache are removed, while tables mapped from them stay valid
+    assert table["formation_energy"][2] == -0.3
+    cache_files = {file.name for file in manifest.parent.iterdir()}
+    listed_files = set(json.loads(manifest.read_text())["columns"].values())
+    assert cache_files == listed_files | {"manifest.json"}
+
+
+def test_query_table_concurrent_save(query_data, tmp_path):
+    """Tests that processes saving the same table to one directory at once leave a readable table."""
+    table = QueryTable.from_query_data(query_data)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(table.save, [tmp_path / "table"] * 16))
+    assert QueryTable.load(tmp_path / "table").to_dict() == table.to_dict()
+
+
+@pytest.mark.parametrize("chunk_size", [5, 2**20])
+def test_read_query_columns_projection(query_data, tmp_path, chunk_size):
+    """Tests that only requested columns are read, and that missing properties are masked."""
+    query_data[0]["site_data"] = {"label": 'a "quoted" } ]', "values": [[1, 2], []]}
+    query_data[1]["site_data"] = None
+    del query_data[1]["formation_energy"]
+    del query_data[2]["name"]
+    path = tmp_path / "query.json"
+    path.write_text(json.dumps(query_data))
+
+    columns, masks = read_query_columns(
+        path,
+        chunk_size=chunk_size,
+        columns=["name", "corr", "formation_energy", "is_calculated"],
+        return_masks=True,
+    )
+    assert list(columns) == ["name", "corr", "formation_energy", "is_calculated"]
+    assert columns["name"].tolist() == ["SCEL1", "SCEL2", ""]
+    assert np.allclose(columns["corr"][2], [0.16, 0.5, 0.2])
+    assert np.isnan(columns["formation_energy"][1])
+    assert np.isnan(columns["is_calculated"]).all()
+    assert masks["name"].tolist() == [True, True, False]
+    assert masks["formation_energy"].tolist() == [True, False, True]
+    assert not masks["is_calculated"].any()
+    assert "corr" not in masks
+
+    # Without projection, keys missing from the first configuration are kept
+    table = QueryTable.read(path, chunk_size=chunk_size)
+    assert table["site_data"][0] == query_data[0]["site_data"]
+    assert table.present("site_data").tolist() == [True, True, False]
+    assert table.present("corr").all()
+    assert table.to_dict()["formation_energy"] == [0.0, None, -0.3]
+    assert "formation_energy" not in table[1]
+
+
+@pytest.mark.parametrize("n_workers", [None, 2])
+def test_read_query_tables(query_data, tmp_path, n_workers):
+    """Tests merging query files, de-duplicating names and recording source files."""
+    paths = [tmp_path / "query_0.json", tmp_path / "query_1.json"]
+    paths[0].write_text(json.dumps(query_data[:2]))
+    extra = {"name": "SCEL4", "comp": [[0.25]], "corr": [[1.0], [0.5], [0.25]]}
+    paths[1].write_text(json.dumps(query_data[1:] + [extra]))
+
+    table = read_query_tables(paths, n_workers=n_workers, source_column="source")
+    assert table["name"].tolist() == ["SCEL1", "SCEL2", "SCEL3", "SCEL4"]
+    assert table["source"].tolist() == [str(paths[0])] * 2 + [str(paths[1])] * 2
+    assert table["corr"].shape == (4, 3)
+    assert table.present("formation_energy").tolist() == [True, True, True, False]
+    assert len(read_query_tables(paths, deduplicate=False)) == 5
+
+    extra["corr"] = [[1.0], [0.5]]
+    paths[1].write_text(json.dumps([extra]))
+    with pytest.raises(ValueError):
+        read_query_tables(paths, n_workers=n_workers)
+
+
+def test_read_query_tables_projected_missing_columns(query_data, tmp_path):
+    """Tests that projected columns a file never contains are masked when merging, as without projection."""
+    paths = [tmp_path / "query_0.json", tmp_path / "query_1.json"]
+    paths[0].write_text(json.dumps(query_data[:2]))
+    paths[1].write_text(json.dumps([{"formation_energy": -0.1, "comp": [[0.3]]}]))
+
+    columns = ["name", "corr", "formation_energy"]
+    table = read_query_tables(paths, columns=columns)
+    assert list(table.keys()) == columns
+    assert table["name"].tolist() == ["SCEL1", "SCEL2", ""]
+    assert table["corr"].shape == (3, 3)
+    assert np.isnan(table["corr"][2]).all()
+    assert table.present("name").tolist() == [True, True, False]
+    assert table.present("corr").tolist() == [True, True, False]
+    unprojected = read_query_tables(paths).to_dict()
+    assert table.to_dict() == {key: unprojected[key] for key in columns}
+
+
+def test_read_query_columns_mismatched_values(tmp_path):
+    """Tests that values not fitting a numeric column make it an object column instead of being broadcast."""
+    path = tmp_path / "query.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"corr": [[1.0], [0.5]], "x": [1, 2, 3], "count": 1},
+                {"corr": [[0.5]], "x": 5, "count": 2**70},
+            ]
+        )
+    )
+    columns = read_query_columns(path)
+    assert columns["corr"].dtype == object
+    assert columns["corr"].tolist() == [[1.0, 0.5], [[0.5]]]
+    assert columns["x"].tolist() == [[1.0, 2.0, 3.0], 5]
+    assert columns["count"].tolist() == [1, 2**70]
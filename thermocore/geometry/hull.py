@@ -1,13 +1,22 @@
+import hashlib
+import json
+import os
+import tempfile
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from scipy.optimize import linprog
-from scipy.spatial import ConvexHull
-from typing import List, Tuple, Sequence
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+from scipy.spatial import ConvexHull, QhullError, cKDTree
+from typing import Callable, List, Optional, Tuple, Sequence
 
 
 def barycentric_coordinates(point: np.ndarray, vertices: np.ndarray) -> np.ndarray:
     """Returns the barycentric coordinates of `point` with respect to the simplex defined by `vertices`.
 
-    TODO: Take multiple points?
+    To evaluate many points at once, possibly with respect to different simplices, use `batch_barycentric_coordinates`.
 
     Parameters
     ----------
@@ -35,16 +44,148 @@ def barycentric_coordinates(point: np.ndarray, vertices: np.ndarray) -> np.ndarr
     return H_inv @ np.append(point, 1)
 
 
-def inside_convex_hull(points: np.ndarray, test_points: np.ndarray) -> List[bool]:
-    """Returns a list of booleans indicating whether each point in `test_points` is inside the convex hull of `points`.
+def barycentric_transforms(
+    vertices: np.ndarray, tolerance: float = 1e-12
+) -> np.ndarray:
+    """Returns the matrices mapping homogeneous points (x, 1) to barycentric coordinates for each simplex in `vertices`.
+
+    For a simplex with vertices v_0, ..., v_n, the transform is the inverse of the matrix whose columns are (v_i, 1).
+    Degenerate (zero volume) simplices have no transform, and are given transforms of NaN instead. Such simplices
+    appear e.g. when Qhull triangulates coplanar lower hull facets.
+
+    Parameters
+    ----------
+    vertices : np.ndarray of floats, shape (n_simplices, n_dim + 1, n_dim)
+        Vertices of each simplex.
+    tolerance : float, optional
+        Simplices whose matrix has an absolute determinant (n_dim! times the simplex volume) below `tolerance`
+        are considered degenerate (default is 1e-12).
+
+    Returns
+    -------
+    np.ndarray of floats, shape (n_simplices, n_dim + 1, n_dim + 1)
+        Barycentric transform of each simplex, or NaN for degenerate simplices.
+    """
+    n_simplices, n_vertices, n_dim = vertices.shape
+    if not n_vertices == n_dim + 1:
+        raise ValueError("Number of vertices provided inconsistent with dimension.")
+
+    H = np.concatenate(
+        (np.transpose(vertices, (0, 2, 1)), np.ones((n_simplices, 1, n_dim + 1))),
+        axis=1,
+    )
+    degenerate = np.abs(np.linalg.det(H)) <= tolerance
+    transforms = np.full(H.shape, np.nan)
+    transforms[~degenerate] = np.linalg.inv(H[~degenerate])
+    return transforms
+
+
+def batch_barycentric_coordinates(
+    points: np.ndarray, vertices: np.ndarray, simplex_indices: Sequence[int] = None
+) -> np.ndarray:
+    """Returns the barycentric coordinates of each point in `points` with respect to its assigned simplex.
+
+    Each distinct simplex referenced by `simplex_indices` is inverted only once, and the coordinates
+    of all points are then found with a single batched matrix product.
+
+    Parameters
+    ----------
+    points : np.ndarray of floats, shape (n_points, n_dim)
+        Points to get barycentric coordinates for.
+    vertices : np.ndarray of floats, shape (n_simplices, n_dim + 1, n_dim)
+        Vertices of each reference simplex. A single simplex of shape (n_dim + 1, n_dim) may also be given,
+        in which case it is used for every point.
+    simplex_indices : Sequence[int], optional
+        Index (within `vertices`) of the reference simplex for each point, shape (n_points,).
+        Required if more than one simplex is provided.
+
+    Returns
+    -------
+    np.ndarray of floats, shape (n_points, n_dim + 1)
+        Barycentric coordinates of each point.
+    """
+    points = np.asarray(points, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
+    if vertices.ndim == 2:
+        vertices = vertices[np.newaxis, :, :]
+        simplex_indices = np.zeros(len(points), dtype=int)
+    elif simplex_indices is None:
+        if not vertices.shape[0] == 1:
+            raise ValueError(
+                "Simplex indices must be provided when using multiple simplices."
+            )
+        simplex_indices = np.zeros(len(points), dtype=int)
+    simplex_indices = np.asarray(simplex_indices, dtype=int)
+
+    # Check dimensions
+    if not points.shape[1] == vertices.shape[2]:
+        raise ValueError("Point and vertex dimensions inconsistent.")
+    if not simplex_indices.shape == (points.shape[0],):
+        raise ValueError(
+            "Number of simplex indices inconsistent with number of points."
+        )
+
+    # Invert each referenced simplex once, then apply the transforms to all points
+    unique_simplex_indices, point_transform_indices = np.unique(
+        simplex_indices, return_inverse=True
+    )
+    transforms = barycentric_transforms(vertices[unique_simplex_indices])
+    point_transforms = transforms[point_transform_indices.reshape(-1)]
+    return (
+        np.einsum("nij,nj->ni", point_transforms[:, :, :-1], points)
+        + point_transforms[:, :, -1]
+    )
+
+
+def convex_hull_halfspaces(points: np.ndarray) -> Optional[np.ndarray]:
+    """Returns the facet half-spaces of the convex hull of `points`, or None if `points` are degenerate.
+
+    Each row (a_1, ..., a_n, b) of the returned matrix describes the half-space a.x + b <= 0 with a unit normal a,
+    such that a point x is inside the convex hull if it satisfies every inequality. For one-dimensional points
+    the half-spaces are simply the lower and upper bounds.
+
+    Points are degenerate if they do not span the full space (they lie on a lower-dimensional affine subspace),
+    in which case Qhull cannot be used to find the facets.
+
+    Parameters
+    ----------
+    points : np.ndarray of floats, shape (n_points, n_dim)
+        Points defining the convex hull.
+
+    Returns
+    -------
+    np.ndarray of floats, shape (n_facets, n_dim + 1), or None
+        Half-space equations of the convex hull facets, or None if `points` are degenerate.
+    """
+    n_points, n_dim = points.shape
+    if n_points < n_dim + 1:
+        return None
+    if np.linalg.matrix_rank(points - points[0]) < n_dim:
+        return None
+
+    if n_dim == 1:
+        return np.array([[-1.0, np.min(points)], [1.0, -np.max(points)]])
+    try:
+        return ConvexHull(points).equations
+    except QhullError:
+        return None
+
+
+def inside_convex_hull(
+    points: np.ndarray, test_points: np.ndarray, tolerance: float = 1e-10
+) -> np.ndarray:
+    """Returns an array of booleans indicating whether each point in `test_points` is inside the convex hull of `points`.
 
-    This does not require finding the convex hull of `points`, only determining whether each of `test_points`
-    can be expressed as a convex combination of `points`, which can be done using linear programming.
+    The convex hull of `points` is found once, and all test points are then checked against its facet half-spaces
+    (see `convex_hull_halfspaces`) with a single matrix product.
 
-    For a single test point p and the points x_i, we check whether there exist coefficients a_i such that
-    p = a_1*x_1 + a_2*x_2 + ... + a_n*x_n, where the a_i are non-negative and sum to 1.
+    If `points` are degenerate (they lie on a lower-dimensional affine subspace), the facets cannot be found.
+    In that case, each test point is instead checked for whether it can be expressed as a convex combination of
+    `points`, which can be done using linear programming. For a single test point p and the points x_i, we check
+    whether there exist coefficients a_i such that p = a_1*x_1 + a_2*x_2 + ... + a_n*x_n, where the a_i are
+    non-negative and sum to 1.
 
-    Adapted from: https://stackoverflow.com/a/43564754
+    Linear programming approach adapted from: https://stackoverflow.com/a/43564754
 
     Parameters
     ---------
@@ -52,20 +193,309 @@ def inside_convex_hull(points: np.ndarray, test_points: np.ndarray) -> List[bool
         Points defining the convex hull.
     test_points : np.ndarray of floats, shape (n_test_points, n_dim)
         Points to be tested for whether they are inside the convex hull.
+    tolerance : float, optional
+        Distance outside of a facet that is still considered inside the convex hull (default is 1e-10).
+        Only used when `points` are not degenerate.
 
     Returns
     -------
-    list[bool]
+    np.ndarray of bools, shape (n_test_points,)
         Booleans indicating whether each test point is inside the convex hull.
     """
+    halfspaces = convex_hull_halfspaces(points)
+    if halfspaces is not None:
+        return np.all(
+            halfspaces[:, :-1] @ test_points.transpose() + halfspaces[:, -1:]
+            <= tolerance,
+            axis=0,
+        )
+
+    # Fall back on linear programming for degenerate points
     n_points = len(points)
     c = np.zeros(n_points)
     A = np.vstack((points.transpose(), np.ones((1, n_points))))
-    return [linprog(c, A_eq=A, b_eq=np.append(p, 1.0)).success for p in test_points]
+    return np.array(
+        [linprog(c, A_eq=A, b_eq=np.append(p, 1.0)).success for p in test_points],
+        dtype=bool,
+    )
+
+
+def affine_composition_basis(
+    compositions: np.ndarray, tolerance: float = 1e-8
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns an origin and an orthonormal basis of the affine subspace spanned by `compositions`.
+
+    The rank of the subspace is the number of principal directions along which the root-mean-square deviation of
+    `compositions` from their mean exceeds `tolerance`.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points.
+    tolerance : float, optional
+        Root-mean-square deviation below which a direction is considered degenerate (default is 1e-8).
+
+    Returns
+    -------
+    origin : np.ndarray of floats, shape (n_composition_axes,)
+        Mean of `compositions`.
+    basis : np.ndarray of floats, shape (n_composition_axes, rank)
+        Orthonormal basis vectors (columns) of the affine subspace.
+    """
+    origin = np.mean(compositions, axis=0)
+    _, singular_values, right_vectors = np.linalg.svd(
+        compositions - origin, full_matrices=False
+    )
+    rank = np.sum(singular_values / np.sqrt(len(compositions)) > tolerance)
+    return origin, right_vectors[:rank].transpose()
+
+
+def project_compositions(
+    compositions: np.ndarray, convex_hull: ConvexHull, tolerance: float = 1e-8
+) -> np.ndarray:
+    """Returns `compositions` in the composition coordinates of `convex_hull`.
+
+    If the hull was built on projected compositions (see `full_hull`), `compositions` are projected onto the same
+    basis. Otherwise, they are returned unchanged (as a 2D array).
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    convex_hull : ConvexHull
+        Convex hull object.
+    tolerance : float, optional
+        Distance from the affine subspace of the hull above which a point is considered out of bounds (default is 1e-8).
+
+    Returns
+    -------
+    np.ndarray of floats, shape (n_points, n_hull_composition_axes)
+        Compositions in hull coordinates.
+    """
+    return _project_compositions(
+        compositions,
+        getattr(convex_hull, "composition_origin", None),
+        getattr(convex_hull, "composition_basis", None),
+        tolerance,
+    )
+
+
+def _project_compositions(
+    compositions: np.ndarray,
+    origin: Optional[np.ndarray],
+    basis: Optional[np.ndarray],
+    tolerance: float = 1e-8,
+) -> np.ndarray:
+    """Returns `compositions` projected onto the affine subspace given by `origin` and `basis`, if any (see `project_compositions`)."""
+    compositions = _promote_compositions(compositions)
+    if basis is None:
+        return compositions
+    if not compositions.shape[1] == basis.shape[0]:
+        raise ValueError(
+            f"Composition dimensions of input points and hull points differ: {compositions.shape[1]} vs {basis.shape[0]}."
+        )
+
+    centered_compositions = compositions - origin
+    projected_compositions = centered_compositions @ basis
+    out_of_bounds_point_indices = (
+        np.linalg.norm(
+            centered_compositions - projected_compositions @ basis.transpose(), axis=1
+        )
+        > tolerance
+    ).nonzero()[0]
+    if not out_of_bounds_point_indices.size == 0:
+        raise ValueError(
+            f"Point outside of hull composition bounds encountered: Point index {','.join(map(str, out_of_bounds_point_indices))}."
+        )
+    return projected_compositions
+
+
+def _reduce_compositions(
+    compositions: np.ndarray,
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """Returns `compositions` projected onto their affine subspace if they are degenerate, with the origin and basis used.
+
+    Non-degenerate compositions are returned unchanged (as a 2D array), with None for the origin and basis.
+    """
+    compositions = _promote_compositions(compositions)
+    origin, basis = affine_composition_basis(compositions)
+    if basis.shape[1] == compositions.shape[1]:
+        return compositions, None, None
+    return (compositions - origin) @ basis, origin, basis
+
+
+def _set_composition_basis(
+    convex_hull: ConvexHull, origin: Optional[np.ndarray], basis: Optional[np.ndarray]
+) -> ConvexHull:
+    """Stores the composition projection used to build `convex_hull` on it, if any, and returns it."""
+    if basis is not None:
+        convex_hull.composition_origin = origin
+        convex_hull.composition_basis = basis
+    return convex_hull
+
+
+class HullCache:
+    """Least recently used cache of convex hulls, keyed by a hash of the contents of the arrays they are built from.
+
+    Entries are evicted, least recently used first, once there are more than `max_entries` of them or their
+    combined array memory exceeds `max_bytes`.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of cached hulls (default is 32).
+    max_bytes : int, optional
+        Maximum combined size in bytes of the arrays of the cached hulls (default is 1 GiB).
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups that found a cached hull.
+    misses : int
+        Number of lookups that had to build a hull.
+    evictions : int
+        Number of hulls evicted from the cache.
+    n_bytes : int
+        Combined size in bytes of the arrays of the cached hulls.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 2**30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.n_bytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        build: Callable[..., ConvexHull],
+        compositions: np.ndarray,
+        energies: np.ndarray,
+        qhull_options: str = None,
+    ) -> ConvexHull:
+        """Returns the cached hull for `compositions`, `energies` and `qhull_options`, calling `build` with them on a miss.
+
+        Parameters
+        ----------
+        build : Callable
+            Function building the hull, called as build(compositions, energies, qhull_options=qhull_options).
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points.
+        energies : np.ndarray of floats, shape (n_points,)
+            Energies of points.
+        qhull_options : str, optional
+            Additional options passed to Qhull.
+
+        Returns
+        -------
+        ConvexHull
+            Cached or newly built hull.
+        """
+        key = (
+            build.__name__,
+            _array_hash(compositions),
+            _array_hash(energies),
+            qhull_options,
+        )
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        self.misses += 1
+        hull = build(compositions, energies, qhull_options=qhull_options)
+        n_bytes = _hull_bytes(hull)
+        self._entries[key] = (hull, n_bytes)
+        self.n_bytes += n_bytes
+        while len(self._entries) > self.max_entries or (
+            self.n_bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.n_bytes -= evicted_bytes
+            self.evictions += 1
+        return hull
+
+    def clear(self):
+        """Removes all cached hulls and resets the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.n_bytes = 0
+
+    def info(self) -> dict:
+        """Returns the cache statistics as a dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "n_bytes": self.n_bytes,
+        }
+
+
+_hull_cache = None
+
+
+def enable_hull_cache(max_entries: int = 32, max_bytes: int = 2**30) -> HullCache:
+    """Enables caching of the hulls built by `full_hull` and `lower_envelope_hull`, and returns the cache.
+
+    Functions that build hulls when none is provided (e.g. `lower_hull_distances` and `hull_distance_correlations`)
+    then reuse hulls of identical inputs. Intermediate hulls built internally (e.g. for each sample of
+    `ensemble_hull_distances`, for `LowerHull.vertex_depths` or for `prefilter_hull_points`) are not cached, so
+    they do not evict hulls of the user's data. Enabling the cache again replaces the existing cache.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of cached hulls (default is 32).
+    max_bytes : int, optional
+        Maximum combined size in bytes of the arrays of the cached hulls (default is 1 GiB).
+
+    Returns
+    -------
+    HullCache
+        The enabled cache, e.g. for inspecting hit and miss statistics.
+    """
+    global _hull_cache
+    _hull_cache = HullCache(max_entries=max_entries, max_bytes=max_bytes)
+    return _hull_cache
+
+
+def disable_hull_cache():
+    """Disables and discards the hull cache enabled by `enable_hull_cache`."""
+    global _hull_cache
+    _hull_cache = None
+
+
+def _array_hash(array: np.ndarray) -> Tuple[Tuple[int, ...], str, bytes]:
+    """Returns a key identifying the shape, type and contents of `array`."""
+    array = np.ascontiguousarray(array)
+    return (
+        array.shape,
+        array.dtype.str,
+        hashlib.blake2b(array.data, digest_size=16).digest(),
+    )
+
+
+def _hull_bytes(convex_hull: ConvexHull) -> int:
+    """Returns the combined size in bytes of the arrays of `convex_hull`."""
+    return sum(
+        getattr(convex_hull, name).nbytes
+        for name in ["points", "simplices", "neighbors", "equations", "vertices"]
+    )
 
 
 def full_hull(
-    compositions: np.ndarray, energies: np.ndarray, qhull_options=None
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    qhull_options=None,
+    incremental: bool = False,
 ) -> ConvexHull:
     """Returns the full convex hull of the points specified by appending `energies` to `compositions`.
 
@@ -77,14 +507,286 @@ def full_hull(
         Energies of points.
     qhull_options: str
         Additional optionals that can be passed to Qhull. See details on the scipy.spatial.ConvexHull documentation. Default=None
+    incremental: bool
+        Whether to allow adding points to the hull later with `ConvexHull.add_points`. Default=False
     Returns
     -------
     ConvexHull
         Convex hull of points.
+
+    Notes
+    -----
+    If `compositions` lie on a lower-dimensional affine subspace (e.g. a constrained slice of a ternary, or a redundant
+    composition axis), Qhull cannot build the hull in the full composition space. In that case, compositions are
+    projected onto an orthonormal basis of the subspace (see `affine_composition_basis`) before building the hull.
+    The origin and basis are stored on the hull as `composition_origin` and `composition_basis`, the hull points are
+    in the projected coordinates, and `project_compositions` maps other compositions into the same coordinates.
+    Point and simplex indices are unaffected.
+
+    If a hull cache is enabled (see `enable_hull_cache`), non-incremental hulls are looked up in the cache by the
+    contents of `compositions`, `energies` and `qhull_options`, and only built on a miss. Cached hulls are shared
+    between callers and must not be modified.
+    """
+    if _hull_cache is not None and not incremental:
+        return _hull_cache.get(
+            _full_hull, compositions, energies, qhull_options=qhull_options
+        )
+    return _full_hull(
+        compositions, energies, qhull_options=qhull_options, incremental=incremental
+    )
+
+
+def _full_hull(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    qhull_options=None,
+    incremental: bool = False,
+) -> ConvexHull:
+    """Builds the hull returned by `full_hull`, without caching."""
+    compositions, origin, basis = _reduce_compositions(compositions)
+    hull = ConvexHull(
+        np.hstack((compositions, np.asarray(energies)[:, np.newaxis])),
+        incremental=incremental,
+        qhull_options=qhull_options,
+    )
+    return _set_composition_basis(hull, origin, basis)
+
+
+def lower_envelope_hull(
+    compositions: np.ndarray, energies: np.ndarray, qhull_options=None
+) -> ConvexHull:
+    """Returns a convex hull of the points specified by `compositions` and `energies` that only resolves the lower hull in detail.
+
+    A single apex point is added above the centroid of `compositions`, at an energy well above all points.
+    Every point under the cone spanned by the apex and the lower hull is then interior, so Qhull does not build
+    the upper hull of the data, which often makes up most of the facets in higher dimensions. The lower hull
+    vertices and lower hull energies are the same as those of `full_hull`. The lower hull simplices are too for
+    points in general position, but coplanar lower facets may be triangulated differently (including zero volume
+    simplices), so decompositions and hull correlation weights of points on such facets can differ.
+
+    The apex is the last point of the returned hull (index n_points), so the indices of all other points match `compositions`.
+    The hull has an attribute `n_apex_points` (1), so that `LowerHull.from_convex_hull` leaves the apex out of its points.
+    Degenerate compositions are projected, and hulls are cached if enabled, as in `full_hull`.
+
+    Parameters
+    ----------
+    compositions: np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points.
+    energies: np.ndarray of floats, shape (n_points,)
+        Energies of points.
+    qhull_options: str
+        Additional optionals that can be passed to Qhull. See details on the scipy.spatial.ConvexHull documentation. Default=None
+    Returns
+    -------
+    ConvexHull
+        Convex hull of points and the apex point.
+    """
+    if _hull_cache is not None:
+        return _hull_cache.get(
+            _lower_envelope_hull, compositions, energies, qhull_options=qhull_options
+        )
+    return _lower_envelope_hull(compositions, energies, qhull_options=qhull_options)
+
+
+def _lower_envelope_hull(
+    compositions: np.ndarray, energies: np.ndarray, qhull_options=None
+) -> ConvexHull:
+    """Builds the hull returned by `lower_envelope_hull`, without caching."""
+    compositions, origin, basis = _reduce_compositions(compositions)
+    return _set_composition_basis(
+        _apex_hull(compositions, energies, qhull_options=qhull_options), origin, basis
+    )
+
+
+def _apex_hull(
+    compositions: np.ndarray, energies: np.ndarray, qhull_options=None
+) -> ConvexHull:
+    """Builds the hull of `lower_envelope_hull` for non-degenerate compositions of shape (n_points, n_composition_axes)."""
+    energies = np.asarray(energies, dtype=float)
+    apex = np.append(
+        np.mean(compositions, axis=0),
+        np.max(energies) + 10 * (np.ptp(energies) + 1),
+    )
+    hull = ConvexHull(
+        np.vstack((np.hstack((compositions, energies[:, np.newaxis])), apex)),
+        qhull_options=qhull_options,
+    )
+    hull.n_apex_points = 1
+    return hull
+
+
+def prefilter_hull_points(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    composition_tolerance: float = 1e-10,
+    prune: bool = False,
+    n_coarse_bins: int = 8,
+) -> np.ndarray:
+    """Returns indices of the points that can be vertices of the lower hull of `compositions` and `energies`.
+
+    Compositions are binned on a grid with spacing `composition_tolerance`, and only the lowest energy point in
+    each bin is kept, since no other point in the bin can be a lower hull vertex. Building the hull on the kept
+    points gives the same lower hull, and `lower_hull_energies` can still be evaluated for every original point.
+
+    If `prune` is True, points that lie above an upper bound of the lower hull are discarded as well. The bound is
+    the lower hull of the lowest energy point in each bin of a coarse composition grid (with `n_coarse_bins` bins
+    along each axis): the lower hull of all points lies below the lower hull of any subset of them.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_points,)
+        Energies of points.
+    composition_tolerance : float, optional
+        Grid spacing for binning compositions (default is 1e-10).
+    prune : bool, optional
+        Whether to also discard points above the coarse upper bound (default is False).
+    n_coarse_bins : int, optional
+        Number of bins along each composition axis for the coarse upper bound (default is 8).
+
+    Returns
+    -------
+    np.ndarray of ints, shape (n_kept_points,)
+        Sorted indices of kept points.
+    """
+    compositions = _promote_compositions(compositions)
+    energies = np.asarray(energies, dtype=float)
+    kept = _bin_minima(
+        np.round(compositions / composition_tolerance).astype(np.int64), energies
+    )
+    if not prune:
+        return kept
+
+    # Bound the lower hull from above by the lower hull of coarse bin minima
+    lower_bounds = np.min(compositions, axis=0)
+    bin_widths = (np.max(compositions, axis=0) - lower_bounds) / n_coarse_bins
+    bin_widths[bin_widths == 0] = 1
+    coarse_bins = np.floor((compositions[kept] - lower_bounds) / bin_widths).astype(
+        np.int64
+    )
+    coarse_kept = kept[_bin_minima(coarse_bins, energies[kept])]
+    try:
+        upper_bound = LowerHull.from_convex_hull(
+            _full_hull(compositions[coarse_kept], energies[coarse_kept])
+        )
+    except (QhullError, ValueError):
+        # Too few coarse points to form a hull, so no bound is available
+        return kept
+    inside = kept[upper_bound.inside_bounds(compositions[kept])]
+    # Leave a margin for round-off, so that points on the bound are kept
+    above = inside[
+        energies[inside] > upper_bound.energies(compositions[inside]) + 1e-10
+    ]
+    return np.setdiff1d(kept, above)
+
+
+def _bin_minima(bins: np.ndarray, energies: np.ndarray) -> np.ndarray:
+    """Returns sorted indices of the lowest energy point in each bin, where rows of the 2D integer array `bins` label the bins."""
+    _, bin_labels = np.unique(bins, axis=0, return_inverse=True)
+    bin_labels = bin_labels.reshape(-1)
+    order = np.lexsort((energies, bin_labels))
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = bin_labels[order[1:]] != bin_labels[order[:-1]]
+    return np.sort(order[is_first])
+
+
+def binary_lower_hull(compositions: np.ndarray, energies: np.ndarray) -> np.ndarray:
+    """Returns the vertices of the lower convex hull of points with one composition axis, sorted by composition.
+
+    Uses a monotone chain scan over points sorted by composition, which takes O(n log n) time and does not require Qhull.
+    Only the lowest energy point at each composition is considered, and most non-vertices are discarded by vectorized
+    passes before the scan. Points on a straight segment between two vertices are not vertices.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points,) or (n_points, 1)
+        Compositions of points.
+    energies : np.ndarray of floats, shape (n_points,)
+        Energies of points.
+
+    Returns
+    -------
+    np.ndarray of ints, shape (n_vertices,)
+        Indices of points forming the vertices of the lower convex hull, in order of increasing composition.
     """
-    return ConvexHull(
-        np.hstack((compositions, energies[:, np.newaxis])), qhull_options=qhull_options
+    compositions = _promote_compositions(compositions)
+    if not compositions.shape[1] == 1:
+        raise ValueError(
+            f"Binary lower hull requires one composition axis, not {compositions.shape[1]}."
+        )
+    x = compositions[:, 0]
+    energies = np.asarray(energies, dtype=float)
+
+    # Sort by composition, and keep the lowest energy point at each composition
+    order = np.argsort(x)
+    sorted_x, sorted_energies = x[order], energies[order]
+    group_starts = np.flatnonzero(np.append(True, sorted_x[1:] != sorted_x[:-1]))
+    group_labels = np.repeat(
+        np.arange(len(group_starts)), np.diff(np.append(group_starts, len(order)))
     )
+    minimum_positions = np.flatnonzero(
+        sorted_energies
+        == np.minimum.reduceat(sorted_energies, group_starts)[group_labels]
+    )
+    candidates = order[
+        minimum_positions[
+            np.append(
+                True,
+                group_labels[minimum_positions[1:]]
+                != group_labels[minimum_positions[:-1]],
+            )
+        ]
+    ]
+
+    # Vectorized passes discarding every candidate on or above the segment between its neighbors.
+    # Each discarded point is above a chord between two other points, so it cannot be a vertex.
+    candidate_x, candidate_energies = x[candidates], energies[candidates]
+    while len(candidates) > 2:
+        is_convex = (
+            _cross(
+                candidate_x[:-2],
+                candidate_energies[:-2],
+                candidate_x[1:-1],
+                candidate_energies[1:-1],
+                candidate_x[2:],
+                candidate_energies[2:],
+            )
+            > 0
+        )
+        n_discarded = len(is_convex) - np.count_nonzero(is_convex)
+        is_kept = np.concatenate(([True], is_convex, [True]))
+        candidates = candidates[is_kept]
+        candidate_x, candidate_energies = (
+            candidate_x[is_kept],
+            candidate_energies[is_kept],
+        )
+        if n_discarded < 0.01 * len(candidates):
+            break
+
+    # Monotone chain scan of the remaining candidates, discarding points that do not make a counterclockwise turn
+    vertices = []
+    for index in candidates:
+        while (
+            len(vertices) >= 2
+            and _cross(
+                x[vertices[-2]],
+                energies[vertices[-2]],
+                x[vertices[-1]],
+                energies[vertices[-1]],
+                x[index],
+                energies[index],
+            )
+            <= 0
+        ):
+            vertices.pop()
+        vertices.append(index)
+    return np.array(vertices, dtype=int)
+
+
+def _cross(x0, e0, x1, e1, x2, e2):
+    """Returns the z component of the cross product of (x1 - x0, e1 - e0) and (x2 - x0, e2 - e0), positive for counterclockwise turns."""
+    return (x1 - x0) * (e2 - e0) - (e1 - e0) * (x2 - x0)
 
 
 def lower_hull(
@@ -169,16 +871,120 @@ def simplex_energy_equation_matrix(
     )
 
 
+def lower_hull_neighbors(
+    convex_hull: ConvexHull, lower_hull_simplex_indices: Sequence[int]
+) -> np.ndarray:
+    """Returns the neighboring lower hull simplices of each lower hull simplex of `convex_hull`.
+
+    Parameters
+    ----------
+    convex_hull : ConvexHull
+        Complete convex hull object.
+    lower_hull_simplex_indices : Sequence[int]
+        Indices of lower hull simplices (within `convex_hull.simplices`).
+
+    Returns
+    -------
+    np.ndarray of ints, shape (n_simplices, n_composition_axes + 1)
+        Position (within `lower_hull_simplex_indices`) of the lower hull simplex opposite each vertex of each
+        lower hull simplex, or -1 where the neighbor is not a lower hull simplex (the boundary of the composition space).
+    """
+    lower_hull_simplex_indices = np.asarray(lower_hull_simplex_indices)
+    lower_positions = np.full(len(convex_hull.simplices), -1)
+    lower_positions[lower_hull_simplex_indices] = np.arange(
+        len(lower_hull_simplex_indices)
+    )
+    return lower_positions[convex_hull.neighbors[lower_hull_simplex_indices]]
+
+
+def simplex_walk(
+    points: np.ndarray,
+    transforms: np.ndarray,
+    neighbors: np.ndarray,
+    start_simplices: np.ndarray,
+    tolerance: float = 1e-10,
+    max_steps: int = None,
+) -> np.ndarray:
+    """Returns the simplex containing each point in `points`, found by walking across a triangulation.
+
+    Starting from `start_simplices`, each point repeatedly moves to the neighbor opposite its most negative
+    barycentric coordinate until all of its coordinates are non-negative. All points walk simultaneously.
+    For triangulations that are projections of lower convex hulls (regular triangulations), the walk cannot cycle,
+    and with good starting simplices it only takes a few steps. Degenerate simplices (with NaN transforms, see
+    `barycentric_transforms`) are treated as containing no points, and walks entering them end.
+
+    Parameters
+    ----------
+    points : np.ndarray of floats, shape (n_points, n_dim)
+        Points to locate.
+    transforms : np.ndarray of floats, shape (n_simplices, n_dim + 1, n_dim + 1)
+        Barycentric transform of each simplex (see `barycentric_transforms`).
+    neighbors : np.ndarray of ints, shape (n_simplices, n_dim + 1)
+        Simplex opposite each vertex of each simplex, or -1 if there is none (see `lower_hull_neighbors`).
+    start_simplices : np.ndarray of ints, shape (n_points,)
+        Simplex to start the walk from for each point.
+    tolerance : float, optional
+        Barycentric coordinates above -`tolerance` are considered non-negative (default is 1e-10).
+    max_steps : int, optional
+        Maximum number of steps for each point. Default is the number of simplices.
+
+    Returns
+    -------
+    np.ndarray of ints, shape (n_points,)
+        Simplex containing each point, or -1 where the walk left the triangulation, entered a degenerate simplex
+        or did not finish.
+    """
+    if max_steps is None:
+        max_steps = len(transforms)
+    simplices = np.array(start_simplices, dtype=int)
+    active = np.arange(len(points))
+    for _ in range(max_steps + 1):
+        if active.size == 0:
+            break
+        point_transforms = transforms[simplices[active]]
+        coordinates = (
+            np.einsum("nij,nj->ni", point_transforms[:, :, :-1], points[active])
+            + point_transforms[:, :, -1]
+        )
+        opposite_vertices = np.argmin(coordinates, axis=1)
+        minimum_coordinates = coordinates[np.arange(active.size), opposite_vertices]
+        # Coordinates in degenerate simplices are NaN, so such points keep walking (and leave below)
+        walking = ~(minimum_coordinates >= -tolerance)
+        active = active[walking]
+        simplices[active] = np.where(
+            np.isnan(minimum_coordinates[walking]),
+            -1,
+            neighbors[simplices[active], opposite_vertices[walking]],
+        )
+        left = simplices[active] == -1
+        active = active[~left]
+    simplices[active] = -1
+    return simplices
+
+
+# Lower hulls with more simplices than this are searched by walking, rather than by evaluating every simplex
+_WALK_SIMPLEX_THRESHOLD = 64
+
+
 def lower_hull_simplex_containing(
     compositions: np.ndarray,
     convex_hull: ConvexHull,
     lower_hull_simplex_indices: Sequence[int] = None,
     tolerance: float = 1e-14,
+    method: str = "auto",
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Returns the lower convex hull simplices of `convex_hull` containing the points in composition space specified by `compositions`, and the corresponding energies.
 
     For points incident with multiple simplices, one of the simplices is chosen arbitrarily.
 
+    Three point location methods are available. "argmax" evaluates every point on every lower hull simplex and
+    takes the simplex with maximum energy, which costs n_points * n_simplices. "walk" starts each point at the
+    simplex with the nearest centroid and walks across neighboring simplices (see `simplex_walk`), which costs
+    roughly log(n_simplices) per point. "searchsorted" only applies to hulls with one composition axis, and finds
+    the containing segment by binary search over the sorted segment endpoints. "auto" uses "searchsorted" for
+    hulls with one composition axis, and otherwise "walk" for hulls with more than `_WALK_SIMPLEX_THRESHOLD` (64)
+    lower hull simplices.
+
     Parameters
     ----------
     compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
@@ -189,6 +995,8 @@ def lower_hull_simplex_containing(
         Indices of lower hull simplices (within `convex_hull.simplices`), if known.
     tolerance : float, optional
         Tolerance for identifying lower hull simplices (default is 1e-14).
+    method : str, optional
+        Point location method, one of "auto", "walk", "searchsorted" or "argmax" (default is "auto").
 
     Returns
     -------
@@ -200,9 +1008,8 @@ def lower_hull_simplex_containing(
     if lower_hull_simplex_indices is None:
         lower_hull_simplex_indices = lower_hull(convex_hull, tolerance=tolerance)[1]
 
-    # Promote 1D composition array to 2D array, if necessary
-    if compositions.ndim == 1:
-        compositions = compositions[:, np.newaxis]
+    # Promote 1D composition array to 2D array and project onto hull composition axes, if necessary
+    compositions = project_compositions(compositions, convex_hull)
 
     # Check that matrices are compatible with one another
     hull_composition_dimension = convex_hull.points.shape[1] - 1
@@ -213,8 +1020,8 @@ def lower_hull_simplex_containing(
 
     # Check composition bounds for input points
     # TODO: Should maybe use lower hull vertices rather than convex_hull.vertices in case of tolerance issues
-    out_of_bounds = ~np.array(
-        inside_convex_hull(convex_hull.points[convex_hull.vertices, :-1], compositions)
+    out_of_bounds = ~inside_convex_hull(
+        convex_hull.points[convex_hull.vertices, :-1], compositions
     )
     out_of_bounds_point_indices = out_of_bounds.nonzero()[0]
     if not out_of_bounds_point_indices.size == 0:
@@ -222,30 +1029,212 @@ def lower_hull_simplex_containing(
             f"Point outside of hull composition bounds encountered: Point index {','.join(map(str, out_of_bounds_point_indices))}."
         )
 
-    # Form equation matrix and multiply with compositions
+    # Form equation matrix and find the containing simplex of each point
     lower_hull_equation_matrix = simplex_energy_equation_matrix(
         convex_hull, lower_hull_simplex_indices, tolerance=tolerance
     )
-    configuration_simplex_energies = lower_hull_equation_matrix @ np.vstack(
-        [compositions.transpose(), np.ones(compositions.shape[0])]
+    positions, energies = _locate_lower_hull_simplices(
+        compositions,
+        convex_hull,
+        lower_hull_simplex_indices,
+        lower_hull_equation_matrix,
+        method=method,
     )
+    return np.asarray(lower_hull_simplex_indices)[positions], energies
 
-    # Identify and extract correct simplices, energies
-    maximum_energy_simplex_indices = np.argmax(configuration_simplex_energies, axis=0)
-    simplex_indices = lower_hull_simplex_indices[maximum_energy_simplex_indices]
-    energies = np.take_along_axis(
-        configuration_simplex_energies,
-        maximum_energy_simplex_indices[np.newaxis, :],
-        axis=0,
-    )[0]
-    return simplex_indices, energies
 
-
-def lower_hull_energies(
+def _locate_lower_hull_simplices(
+    compositions: np.ndarray,
+    convex_hull: ConvexHull,
+    lower_hull_simplex_indices: Sequence[int],
+    lower_hull_equation_matrix: np.ndarray,
+    method: str = "auto",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the position (within `lower_hull_simplex_indices`) of the simplex containing each composition, and the energy on that simplex.
+
+    Compositions are not checked against the composition bounds of the hull. See `lower_hull_simplex_containing` for `method`.
+    """
+    lower_hull_simplex_compositions = convex_hull.points[
+        convex_hull.simplices[lower_hull_simplex_indices], :-1
+    ]
+    method = _point_location_method(
+        method, convex_hull.points.shape[1] - 1, len(lower_hull_simplex_indices)
+    )
+    return _locate_simplices(
+        compositions,
+        lower_hull_equation_matrix,
+        lower_hull_simplex_compositions,
+        method=method,
+        neighbors=(
+            lower_hull_neighbors(convex_hull, lower_hull_simplex_indices)
+            if method == "walk"
+            else None
+        ),
+    )
+
+
+def _point_location_method(
+    method: str, n_composition_axes: int, n_simplices: int
+) -> str:
+    """Returns the point location method to use for `method`, resolving "auto" (see `lower_hull_simplex_containing`)."""
+    if method == "auto":
+        if n_composition_axes == 1:
+            return "searchsorted"
+        if n_simplices > _WALK_SIMPLEX_THRESHOLD:
+            return "walk"
+        return "argmax"
+    if method not in ("walk", "searchsorted", "argmax"):
+        raise ValueError(f"Unknown point location method: {method}.")
+    return method
+
+
+def _locate_simplices(
+    compositions: np.ndarray,
+    equation_matrix: np.ndarray,
+    simplex_compositions: np.ndarray,
+    method: str = "auto",
+    neighbors: np.ndarray = None,
+    transforms: np.ndarray = None,
+    centroid_tree: Tuple[cKDTree, np.ndarray] = None,
+    segment_endpoints: Tuple[np.ndarray, np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the simplex (row of `equation_matrix`) containing each composition, and the energy on that simplex.
+
+    `simplex_compositions` has shape (n_simplices, n_composition_axes + 1, n_composition_axes). `neighbors` is
+    required for "walk". The remaining arguments are point location state that is computed from
+    `simplex_compositions` when not given (see `LowerHull`, which precomputes it).
+    """
+    method = _point_location_method(
+        method, simplex_compositions.shape[2], len(simplex_compositions)
+    )
+    if method == "searchsorted":
+        if segment_endpoints is None:
+            segment_endpoints = _sorted_segment_endpoints(simplex_compositions)
+        return _search_lower_hull_segments(
+            compositions, equation_matrix, *segment_endpoints
+        )
+    if transforms is None:
+        transforms = barycentric_transforms(simplex_compositions)
+    if method == "walk":
+        if centroid_tree is None:
+            centroid_tree = _simplex_centroid_tree(simplex_compositions, transforms)
+        return _walk_lower_hull(
+            compositions, equation_matrix, transforms, neighbors, *centroid_tree
+        )
+    return _maximum_energy_simplices(
+        compositions, equation_matrix, np.isnan(transforms[:, 0, 0])
+    )
+
+
+def _sorted_segment_endpoints(
+    segment_compositions: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the sorted left endpoints of lower hull segments (simplices with one composition axis), and the sorting order.
+
+    `segment_compositions` has shape (n_segments, 2, 1).
+    """
+    if not segment_compositions.shape[1:] == (2, 1):
+        raise ValueError(
+            "Binary search point location requires hulls with one composition axis."
+        )
+    left_endpoints = np.min(segment_compositions[:, :, 0], axis=1)
+    order = np.argsort(left_endpoints)
+    return left_endpoints[order], order
+
+
+def _search_lower_hull_segments(
+    compositions: np.ndarray,
+    equation_matrix: np.ndarray,
+    sorted_left_endpoints: np.ndarray,
+    order: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the lower hull segment (row of `equation_matrix`) containing each composition, and the energy on that segment.
+
+    Segments are found by binary search over their sorted left endpoints (see `_sorted_segment_endpoints`).
+    """
+    sorted_positions = np.clip(
+        np.searchsorted(sorted_left_endpoints, compositions[:, 0], side="right") - 1,
+        0,
+        len(order) - 1,
+    )
+    positions = order[sorted_positions]
+    energies = (
+        equation_matrix[positions, 0] * compositions[:, 0]
+        + equation_matrix[positions, 1]
+    )
+    return positions, energies
+
+
+def _maximum_energy_simplices(
+    compositions: np.ndarray,
+    equation_matrix: np.ndarray,
+    degenerate: np.ndarray = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the simplex (row of `equation_matrix`) with maximum energy at each composition, and that energy.
+
+    This evaluates every point on every simplex, with cost proportional to n_points * n_simplices.
+    Simplices flagged in `degenerate` are never chosen; the facets they lie in are covered by other simplices.
+    """
+    configuration_simplex_energies = (
+        equation_matrix[:, :-1] @ compositions.transpose() + equation_matrix[:, -1:]
+    )
+    if degenerate is not None:
+        configuration_simplex_energies[degenerate] = -np.inf
+    maximum_energy_simplex_indices = np.argmax(configuration_simplex_energies, axis=0)
+    energies = np.take_along_axis(
+        configuration_simplex_energies,
+        maximum_energy_simplex_indices[np.newaxis, :],
+        axis=0,
+    )[0]
+    return maximum_energy_simplex_indices, energies
+
+
+def _walk_lower_hull(
+    compositions: np.ndarray,
+    equation_matrix: np.ndarray,
+    transforms: np.ndarray,
+    neighbors: np.ndarray,
+    centroid_tree: cKDTree,
+    centroid_simplices: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the lower hull simplex containing each composition, and the energy on that simplex.
+
+    Each walk starts from the simplex with the nearest centroid (see `_simplex_centroid_tree`).
+    Points that cannot be located by walking are located with `_maximum_energy_simplices` instead.
+    """
+    _, nearest_centroids = centroid_tree.query(compositions)
+    positions = simplex_walk(
+        compositions, transforms, neighbors, centroid_simplices[nearest_centroids]
+    )
+    unresolved = (positions == -1).nonzero()[0]
+    if not unresolved.size == 0:
+        positions[unresolved] = _maximum_energy_simplices(
+            compositions[unresolved], equation_matrix, np.isnan(transforms[:, 0, 0])
+        )[0]
+    energies = (
+        np.einsum("ij,ij->i", equation_matrix[positions, :-1], compositions)
+        + equation_matrix[positions, -1]
+    )
+    return positions, energies
+
+
+def _simplex_centroid_tree(
+    simplex_compositions: np.ndarray, transforms: np.ndarray
+) -> Tuple[cKDTree, np.ndarray]:
+    """Returns a tree of the centroids of the non-degenerate simplices in `simplex_compositions`, and the indices of those simplices."""
+    centroid_simplices = np.flatnonzero(~np.isnan(transforms[:, 0, 0]))
+    return (
+        cKDTree(np.mean(simplex_compositions[centroid_simplices], axis=1)),
+        centroid_simplices,
+    )
+
+
+def lower_hull_energies(
     compositions: np.ndarray,
     convex_hull: ConvexHull,
     lower_hull_simplex_indices: Sequence[int] = None,
     tolerance: float = 1e-14,
+    chunk_size: int = None,
 ) -> np.ndarray:
     """Returns energies of points in composition space specified by `compositions` along the lower hull of `convex_hull`.
 
@@ -259,15 +1248,63 @@ def lower_hull_energies(
         Indices of lower hull simplices (within `convex_hull.simplices`), if known.
     tolerance : float, optional
         Tolerance for identifying lower hull simplices (default is 1e-14).
+    chunk_size : int, optional
+        If provided, points are processed in blocks of at most `chunk_size` points, such that peak memory
+        does not depend on the number of points. Default is to process all points at once.
 
     Returns
     -------
     np.ndarray of floats, shape (n_points,)
         Energies of points.
     """
-    return lower_hull_simplex_containing(
+    if chunk_size is None:
+        return lower_hull_simplex_containing(
+            compositions, convex_hull, lower_hull_simplex_indices, tolerance=tolerance
+        )[1]
+    # Build the per-hull point location state once, and only locate points block by block
+    return LowerHull.from_convex_hull(
+        convex_hull, tolerance, lower_hull_simplex_indices
+    ).energies(compositions, chunk_size=chunk_size)
+
+
+def lower_hull_decomposition(
+    compositions: np.ndarray,
+    convex_hull: ConvexHull,
+    lower_hull_simplex_indices: Sequence[int] = None,
+    tolerance: float = 1e-14,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the decomposition of the points in composition space specified by `compositions` into lower hull vertices of `convex_hull`.
+
+    Each point is expressed as a convex combination of the vertices of its containing lower hull simplex (see
+    `lower_hull_simplex_containing`), with the barycentric coordinates as fractions. All points are decomposed at once.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points to decompose. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    convex_hull : ConvexHull
+        Complete convex hull object. Last coordinate of each point is assumed to be energy.
+    lower_hull_simplex_indices : Sequence[int], optional
+        Indices of lower hull simplices (within `convex_hull.simplices`), if known.
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+
+    Returns
+    -------
+    vertex_indices : np.ndarray of ints, shape (n_points, n_composition_axes + 1)
+        Indices of the points of `convex_hull` that each point decomposes into.
+    fractions : np.ndarray of floats, shape (n_points, n_composition_axes + 1)
+        Fraction of each vertex in the decomposition of each point.
+    """
+    simplex_indices, _ = lower_hull_simplex_containing(
         compositions, convex_hull, lower_hull_simplex_indices, tolerance=tolerance
-    )[1]
+    )
+    fractions = batch_barycentric_coordinates(
+        project_compositions(compositions, convex_hull),
+        convex_hull.points[convex_hull.simplices, :-1],
+        simplex_indices,
+    )
+    return convex_hull.simplices[simplex_indices], fractions
 
 
 def lower_hull_distances(
@@ -276,10 +1313,13 @@ def lower_hull_distances(
     convex_hull: ConvexHull = None,
     lower_hull_simplex_indices: Sequence[int] = None,
     tolerance: float = 1e-14,
+    chunk_size: int = None,
+    prefilter: bool = False,
 ) -> np.ndarray:
     """Returns hull distances (energy above lower convex hull of `convex_hull`) of points in energy-composition space specified by `compositions` and `energies`.
 
     If `convex_hull` is omitted, it will be calculated from `compositions` and `energies`.
+    For points with one composition axis, the lower hull is then found directly with `binary_lower_hull` instead.
 
     Parameters
     ----------
@@ -293,18 +1333,372 @@ def lower_hull_distances(
         Indices of lower hull simplices (within `convex_hull.simplices`), if known.
     tolerance : float, optional
         Tolerance for identifying lower hull simplices (default is 1e-14).
+    chunk_size : int, optional
+        If provided, points are processed in blocks of at most `chunk_size` points, such that peak memory
+        does not depend on the number of points. Default is to process all points at once.
+    prefilter : bool, optional
+        If `convex_hull` is omitted, whether to build it only from the points kept by `prefilter_hull_points`
+        (default is False). Hull distances are still returned for every point.
 
     Returns
     -------
     np.ndarray of floats, shape (n_points,)
         Hull distances of points.
     """
+    if convex_hull is None and _promote_compositions(compositions).shape[1] == 1:
+        # Binary fast path: no Qhull, no bounds check (every point is one of the hull points)
+        compositions = _promote_compositions(compositions)[:, 0]
+        vertices = binary_lower_hull(compositions, energies)
+        return energies - np.interp(
+            compositions, compositions[vertices], np.asarray(energies)[vertices]
+        )
     if convex_hull is None:
-        convex_hull = full_hull(compositions, energies)
+        hull_points = (
+            prefilter_hull_points(compositions, energies) if prefilter else slice(None)
+        )
+        # Hulls of prefiltered points are specific to this call, so only full data hulls go through the cache
+        convex_hull = (_full_hull if prefilter else full_hull)(
+            _promote_compositions(compositions)[hull_points],
+            np.asarray(energies)[hull_points],
+        )
         lower_hull_simplex_indices = None
     return energies - lower_hull_energies(
-        compositions, convex_hull, lower_hull_simplex_indices, tolerance=tolerance
+        compositions,
+        convex_hull,
+        lower_hull_simplex_indices,
+        tolerance=tolerance,
+        chunk_size=chunk_size,
+    )
+
+
+def ensemble_hull_distances(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    n_workers: int = None,
+    tolerance: float = 1e-14,
+) -> np.ndarray:
+    """Returns hull distances of the same points for each sample in an ensemble of energies.
+
+    Each row of `energies` (e.g. formation energies predicted by one ECI sample) defines its own lower hull
+    of the points specified by `compositions`. Since every point is one of the points the hull is built from,
+    no composition bounds check is needed. Each hull is built as in `lower_envelope_hull`, on compositions
+    projected once for all samples; hull construction and point location are repeated for every sample.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points, shared by all samples. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_samples, n_points)
+        Energies of points for each sample.
+    n_workers : int, optional
+        Number of processes to distribute samples over. Default is to evaluate all samples in the current process.
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+
+    Returns
+    -------
+    np.ndarray of floats, shape (n_samples, n_points)
+        Hull distances of points for each sample.
+    """
+    return np.vstack(
+        _map_ensemble(
+            _sample_hull_distances, compositions, energies, n_workers, tolerance
+        )
+    )
+
+
+def ensemble_ground_states(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    reference_vertex_indices: Sequence[int] = None,
+    n_workers: int = None,
+    tolerance: float = 1e-14,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns how often each point is a lower hull vertex across an ensemble of energies, and how well each sample reproduces reference ground states.
+
+    Each row of `energies` (e.g. formation energies predicted by one ECI sample) defines its own lower hull
+    of the points specified by `compositions`. Only the lower hull vertices of each sample are kept, not the hulls.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points, shared by all samples. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_samples, n_points)
+        Energies of points for each sample.
+    reference_vertex_indices : Sequence[int], optional
+        Indices of the reference ground states (e.g. lower hull vertices of DFT energies, see `lower_hull`).
+        If not provided, no points are considered ground states, so every vertex of a sample is counted as spurious.
+    n_workers : int, optional
+        Number of processes to distribute samples over. Default is to evaluate all samples in the current process.
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+
+    Returns
+    -------
+    vertex_frequencies : np.ndarray of floats, shape (n_points,)
+        Fraction of samples in which each point is a lower hull vertex.
+        For reference ground states, this is the fraction of samples reproducing that ground state.
+    n_missing : np.ndarray of ints, shape (n_samples,)
+        Number of reference ground states that are not lower hull vertices in each sample.
+    n_spurious : np.ndarray of ints, shape (n_samples,)
+        Number of lower hull vertices in each sample that are not reference ground states.
+        A sample reproduces the reference ground states exactly if both `n_missing` and `n_spurious` are zero.
+    """
+    is_vertex = np.vstack(
+        _map_ensemble(
+            _sample_lower_hull_vertices, compositions, energies, n_workers, tolerance
+        )
     )
+    is_reference = np.zeros(is_vertex.shape[1], dtype=bool)
+    if reference_vertex_indices is not None:
+        is_reference[np.asarray(reference_vertex_indices, dtype=int)] = True
+
+    vertex_frequencies = np.mean(is_vertex, axis=0)
+    n_missing = np.sum(~is_vertex & is_reference, axis=1)
+    n_spurious = np.sum(is_vertex & ~is_reference, axis=1)
+    return vertex_frequencies, n_missing, n_spurious
+
+
+def _map_ensemble(
+    function: Callable[[np.ndarray, np.ndarray, float], np.ndarray],
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    n_workers: int = None,
+    tolerance: float = 1e-14,
+) -> list:
+    """Returns `function(reduced_compositions, sample_energies, tolerance)` for each row of `energies`.
+
+    The work shared by all samples is done once: degenerate compositions are projected onto their affine
+    subspace (see `_reduce_compositions`) before any sample is evaluated, and with `n_workers`, the projected
+    compositions are sent to each worker process only once. Building each hull and locating points on it
+    depend on the sample energies, and are done by `function` for every sample.
+    `function` must be defined at module level, so that it can be sent to worker processes.
+    """
+    compositions = _reduce_compositions(compositions)[0]
+    energies = np.atleast_2d(np.asarray(energies, dtype=float))
+    if not energies.shape[1] == compositions.shape[0]:
+        raise ValueError(
+            f"Number of points in compositions and energies differ: {compositions.shape[0]} vs {energies.shape[1]}."
+        )
+
+    if n_workers is None or n_workers == 1:
+        return [
+            function(compositions, sample_energies, tolerance)
+            for sample_energies in energies
+        ]
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_set_ensemble_compositions,
+        initargs=(compositions,),
+    ) as executor:
+        return list(
+            executor.map(
+                _call_with_ensemble_compositions,
+                repeat(function),
+                energies,
+                repeat(tolerance),
+                chunksize=max(1, len(energies) // (4 * n_workers)),
+            )
+        )
+
+
+_ensemble_compositions = None
+
+
+def _set_ensemble_compositions(compositions: np.ndarray):
+    """Stores the compositions shared by all samples in a worker process of `_map_ensemble`.
+
+    Forked workers inherit the hull cache of the parent process, which they do not use, so it is dropped.
+    """
+    global _ensemble_compositions, _hull_cache
+    _ensemble_compositions = compositions
+    _hull_cache = None
+
+
+def _call_with_ensemble_compositions(
+    function: Callable[[np.ndarray, np.ndarray, float], np.ndarray],
+    energies: np.ndarray,
+    tolerance: float,
+) -> np.ndarray:
+    """Returns `function` evaluated for one sample, in a worker process of `_map_ensemble`."""
+    return function(_ensemble_compositions, energies, tolerance)
+
+
+def _sample_lower_hull_vertices(
+    compositions: np.ndarray, energies: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """Returns booleans indicating whether each point specified by (non-degenerate) `compositions` and `energies` is a vertex of their lower hull."""
+    is_vertex = np.zeros(len(energies), dtype=bool)
+    is_vertex[
+        lower_hull(_apex_hull(compositions, energies), tolerance=tolerance)[0]
+    ] = True
+    return is_vertex
+
+
+def _sample_hull_distances(
+    compositions: np.ndarray, energies: np.ndarray, tolerance: float
+) -> np.ndarray:
+    """Returns hull distances of the points specified by (non-degenerate) `compositions` and `energies`, with respect to their own lower hull."""
+    hull = _apex_hull(compositions, energies)
+    _, lower_hull_simplex_indices = lower_hull(hull, tolerance=tolerance)
+    hull_energies = _locate_lower_hull_simplices(
+        compositions,
+        hull,
+        lower_hull_simplex_indices,
+        simplex_energy_equation_matrix(
+            hull, lower_hull_simplex_indices, tolerance=tolerance
+        ),
+    )[1]
+    return energies - hull_energies
+
+
+def chemical_potential_ground_states(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    chemical_potentials: np.ndarray,
+    convex_hull: ConvexHull = None,
+    chunk_size: int = 65536,
+    tolerance: float = 1e-14,
+) -> np.ndarray:
+    """Returns the point minimizing the grand canonical energy E - mu.x at each chemical potential mu in `chemical_potentials`.
+
+    Only lower hull vertices can minimize E - mu.x, so the minimum is taken over the vertices only, with one
+    matrix product per block of chemical potentials.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_points,)
+        Energies of points.
+    chemical_potentials : np.ndarray of floats, shape (n_grid_points, n_composition_axes)
+        Chemical potentials to find ground states for. If a 1D array is provided, it is assumed to be a column.
+    convex_hull : ConvexHull, optional
+        Complete convex hull of `compositions` and `energies`. Calculated if not provided.
+    chunk_size : int, optional
+        Number of chemical potentials processed at once, which bounds memory use (default is 65536).
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+
+    Returns
+    -------
+    np.ndarray of ints, shape (n_grid_points,)
+        Index of the ground state point at each chemical potential.
+    """
+    compositions = _promote_compositions(compositions)
+    chemical_potentials = _promote_compositions(chemical_potentials)
+    energies = np.asarray(energies, dtype=float)
+    if not chemical_potentials.shape[1] == compositions.shape[1]:
+        raise ValueError(
+            f"Chemical potential and composition dimensions differ: {chemical_potentials.shape[1]} vs {compositions.shape[1]}."
+        )
+    if convex_hull is None:
+        convex_hull = full_hull(compositions, energies)
+    vertex_indices, _ = lower_hull(convex_hull, tolerance=tolerance)
+
+    vertex_compositions = compositions[vertex_indices].transpose()
+    vertex_energies = energies[vertex_indices]
+    ground_states = np.empty(len(chemical_potentials), dtype=int)
+    for start in range(0, len(chemical_potentials), chunk_size):
+        grand_canonical_energies = (
+            vertex_energies
+            - chemical_potentials[start : start + chunk_size] @ vertex_compositions
+        )
+        ground_states[start : start + chunk_size] = vertex_indices[
+            np.argmin(grand_canonical_energies, axis=1)
+        ]
+    return ground_states
+
+
+def chemical_potential_stability_halfspaces(
+    compositions: np.ndarray,
+    energies: np.ndarray,
+    convex_hull: ConvexHull = None,
+    tolerance: float = 1e-14,
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Returns the region of chemical potential space in which each lower hull vertex is the ground state.
+
+    Vertex v minimizes E - mu.x wherever mu.(x_w - x_v) <= E_w - E_v for every other vertex w. It suffices to
+    impose this for the vertices w that share a lower hull simplex with v. Regions of vertices at the composition
+    bounds are unbounded.
+
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_points,)
+        Energies of points.
+    convex_hull : ConvexHull, optional
+        Complete convex hull of `compositions` and `energies`. Calculated if not provided.
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+
+    Returns
+    -------
+    vertex_indices : np.ndarray of ints, shape (n_vertices,)
+        Indices of points forming the vertices of the lower convex hull.
+    halfspaces : list of np.ndarray of floats, each of shape (n_neighbors, n_composition_axes + 1)
+        For each vertex, rows (a_1, ..., a_n, b) of the half-spaces a.mu + b <= 0 bounding its stability region.
+    """
+    compositions = _promote_compositions(compositions)
+    energies = np.asarray(energies, dtype=float)
+    if convex_hull is None:
+        convex_hull = full_hull(compositions, energies)
+    vertex_indices, simplex_indices = lower_hull(convex_hull, tolerance=tolerance)
+
+    # Collect pairs of vertices sharing a lower hull simplex
+    simplices = convex_hull.simplices[simplex_indices]
+    n_corners = simplices.shape[1]
+    edges = np.unique(
+        np.vstack(
+            [
+                simplices[:, [first, second]]
+                for first in range(n_corners)
+                for second in range(n_corners)
+                if not first == second
+            ]
+        ),
+        axis=0,
+    )
+    edge_bounds = np.searchsorted(
+        edges[:, 0], np.append(vertex_indices, np.iinfo(int).max)
+    )
+
+    halfspaces = []
+    for position, vertex in enumerate(vertex_indices):
+        neighbors = edges[edge_bounds[position] : edge_bounds[position + 1], 1]
+        halfspaces.append(
+            np.hstack(
+                (
+                    compositions[neighbors] - compositions[vertex],
+                    (energies[vertex] - energies[neighbors])[:, np.newaxis],
+                )
+            )
+        )
+    return vertex_indices, halfspaces
+
+
+def _evaluate_in_chunks(
+    function: Callable[[np.ndarray], np.ndarray],
+    compositions: np.ndarray,
+    chunk_size: int = None,
+) -> np.ndarray:
+    """Returns `function` evaluated on `compositions`, in blocks of at most `chunk_size` points if provided.
+
+    `function` must return one float per point. Results of each block are written into a preallocated array.
+    """
+    compositions = _promote_compositions(compositions)
+    if chunk_size is None:
+        return function(compositions)
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive: {chunk_size}.")
+
+    results = np.empty(len(compositions))
+    for start in range(0, len(compositions), chunk_size):
+        results[start : start + chunk_size] = function(
+            compositions[start : start + chunk_size]
+        )
+    return results
 
 
 def hull_distance_correlations(
@@ -334,6 +1728,8 @@ def hull_distance_correlations(
         nxc matrix of compositions, where n is the number of configurations and c is the number of composition axes.
     formation_energy: np.array
         nx1 matrix of formation energies.
+    hull: ConvexHull, optional
+        Complete convex hull of `compositions` and `formation_energy`. Calculated if not provided.
 
     Returns
     -------
@@ -341,6 +1737,178 @@ def hull_distance_correlations(
         nxk matrix of effective correlations describing hull distance instead of absolute formation energy. n is the number of configurations and k is the number of ECI.
     """
 
+    simplex_vertices, weights = _hull_simplex_weights(
+        compositions, formation_energy, hull
+    )
+
+    # Form the hull distance correlations by subtracting the weighted correlations of the simplex corners.
+    hulldist_corr = np.array(corr, dtype=float)
+    for corner in range(simplex_vertices.shape[1]):
+        hulldist_corr -= (
+            weights[:, corner, np.newaxis] * corr[simplex_vertices[:, corner]]
+        )
+
+    return hulldist_corr
+
+
+def reference_hull_distance_correlations(
+    corr: np.ndarray,
+    compositions: np.ndarray,
+    reference_corr: np.ndarray,
+    reference_compositions: np.ndarray,
+    reference_formation_energy: np.ndarray,
+    hull: ConvexHull = None,
+    chunk_size: int = None,
+) -> np.ndarray:
+    """Calculates hull distance correlations of configurations with respect to the hull of a separate set of reference configurations.
+
+    Unlike `hull_distance_correlations`, the configurations being evaluated (e.g. held out or newly enumerated
+    configurations) do not need to be part of the hull. The hull correlation of each configuration is the
+    difference between its correlations and the barycentric combination of the correlations of the reference
+    ground states at the corners of the lower hull simplex below it.
+
+    Parameters
+    ----------
+    corr: np.array
+        nxk correlation matrix of the configurations to evaluate, where k is the number of ECI.
+    compositions: np.array
+        nxc matrix of compositions of the configurations to evaluate, where c is the number of composition axes.
+        Must be within the composition bounds of the reference configurations.
+    reference_corr: np.array
+        mxk correlation matrix of the reference configurations.
+    reference_compositions: np.array
+        mxc matrix of compositions of the reference configurations.
+    reference_formation_energy: np.array
+        mx1 matrix of formation energies of the reference configurations.
+    hull: ConvexHull, optional
+        Complete convex hull of `reference_compositions` and `reference_formation_energy`. Calculated if not provided.
+    chunk_size: int, optional
+        If provided, configurations are evaluated in blocks of at most `chunk_size` configurations.
+        Default is to evaluate all configurations at once.
+
+    Returns
+    -------
+    hulldist_corr: np.array
+        nxk matrix of effective correlations describing hull distance instead of absolute formation energy.
+    """
+    if hull is None:
+        hull = full_hull(
+            compositions=reference_compositions, energies=reference_formation_energy
+        )
+    lower = LowerHull.from_convex_hull(hull)
+    compositions = _promote_compositions(compositions)
+    if chunk_size is None:
+        chunk_size = max(len(compositions), 1)
+
+    hulldist_corr = np.array(corr, dtype=float)
+    for start in range(0, len(compositions), chunk_size):
+        vertex_indices, weights = lower.decompose(
+            compositions[start : start + chunk_size]
+        )
+        for corner in range(vertex_indices.shape[1]):
+            hulldist_corr[start : start + chunk_size] -= (
+                weights[:, corner, np.newaxis]
+                * reference_corr[vertex_indices[:, corner]]
+            )
+    return hulldist_corr
+
+
+def hull_distance_weights(
+    compositions: np.ndarray,
+    formation_energy: np.ndarray,
+    hull: ConvexHull = None,
+) -> csr_matrix:
+    """Returns the sparse matrix W of barycentric weights used to form hull distance correlations.
+
+    Row i of W holds the barycentric coordinates of configuration i on the corners of its containing lower hull
+    simplex, so each row has at most n_composition_axes + 1 non-zero entries. The hull distance correlations
+    of `hull_distance_correlations` are then (I - W) @ corr.
+
+    Parameters
+    ----------
+    compositions: np.array
+        nxc matrix of compositions, where n is the number of configurations and c is the number of composition axes.
+    formation_energy: np.array
+        nx1 matrix of formation energies.
+    hull: ConvexHull, optional
+        Complete convex hull of `compositions` and `formation_energy`. Calculated if not provided.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix, shape (n, n)
+        Barycentric weight matrix.
+    """
+    simplex_vertices, weights = _hull_simplex_weights(
+        compositions, formation_energy, hull
+    )
+    n_configurations, n_corners = simplex_vertices.shape
+    return csr_matrix(
+        (
+            weights.ravel(),
+            simplex_vertices.ravel(),
+            np.arange(0, n_configurations * n_corners + 1, n_corners),
+        ),
+        shape=(n_configurations, n_configurations),
+    )
+
+
+def hull_distance_operator(
+    corr: np.ndarray,
+    compositions: np.ndarray,
+    formation_energy: np.ndarray,
+    hull: ConvexHull = None,
+) -> LinearOperator:
+    """Returns a linear operator equivalent to the hull distance correlations, without forming them.
+
+    The operator applies (I - W) @ corr, where W is the sparse weight matrix of `hull_distance_weights`.
+    Its matvec computes corr @ x - W @ (corr @ x), so memory scales with n rather than n x k.
+
+    Parameters
+    ----------
+    corr: np.array
+        nxk correlation matrix, where n is the number of configurations and k is the number of ECI.
+    compositions: np.array
+        nxc matrix of compositions, where n is the number of configurations and c is the number of composition axes.
+    formation_energy: np.array
+        nx1 matrix of formation energies.
+    hull: ConvexHull, optional
+        Complete convex hull of `compositions` and `formation_energy`. Calculated if not provided.
+
+    Returns
+    -------
+    scipy.sparse.linalg.LinearOperator, shape (n, k)
+        Operator mapping ECI to hull distances.
+    """
+    weights = hull_distance_weights(compositions, formation_energy, hull)
+
+    def matvec(eci: np.ndarray) -> np.ndarray:
+        energies = corr @ eci
+        return energies - weights @ energies
+
+    def rmatvec(hull_distances: np.ndarray) -> np.ndarray:
+        return corr.transpose() @ (
+            hull_distances - weights.transpose() @ hull_distances
+        )
+
+    return LinearOperator(
+        shape=corr.shape,
+        matvec=matvec,
+        rmatvec=rmatvec,
+        matmat=matvec,
+        rmatmat=rmatvec,
+        dtype=float,
+    )
+
+
+def _hull_simplex_weights(
+    compositions: np.ndarray,
+    formation_energy: np.ndarray,
+    hull: ConvexHull = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the corners of the lower hull simplex containing each configuration, and the barycentric weights on those corners.
+
+    Both arrays have shape (n_configurations, n_composition_axes + 1).
+    """
     # Build convex hull from compositions and formation energies
     if hull is None:
         hull = full_hull(compositions=compositions, energies=formation_energy)
@@ -348,31 +1916,625 @@ def hull_distance_correlations(
     # Get convex hull simplices
     _, lower_simplices = lower_hull(hull)
 
-    hulldist_corr = np.zeros(corr.shape)
+    # Find the simplices that contain each configuration's composition
+    simplex_indices, _ = lower_hull_simplex_containing(
+        compositions=compositions,
+        convex_hull=hull,
+        lower_hull_simplex_indices=lower_simplices,
+    )
+
+    # Find barycentric coordinates of each configuration in composition space, with respect to the corners of its simplex
+    weights = batch_barycentric_coordinates(
+        project_compositions(compositions, hull),
+        hull.points[hull.simplices, :-1],
+        simplex_indices,
+    )
+    return hull.simplices[simplex_indices], weights
+
+
+class LowerHull:
+    """Lower convex hull of points in composition-energy space, with precomputed state for repeated queries.
 
-    for config_index in list(range(corr.shape[0])):
+    The convex hull is built once, and everything that the hull functions in this module rederive on each call
+    (lower hull simplices, their energy equation matrix, the composition bounds and the barycentric transform of
+    each simplex) is cached, so that queries cost only matrix products.
 
-        # Find the simplex that contains the current configuration's composition, and find the hull energy for that composition
-        relevant_simplex_index, _ = lower_hull_simplex_containing(
-            compositions=compositions[config_index].reshape(1, -1),
-            convex_hull=hull,
-            lower_hull_simplex_indices=lower_simplices,
+    Parameters
+    ----------
+    compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+        Compositions of points. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+    energies : np.ndarray of floats, shape (n_points,)
+        Energies of points.
+    qhull_options : str, optional
+        Additional options that can be passed to Qhull. See details on the scipy.spatial.ConvexHull documentation. Default=None
+    tolerance : float, optional
+        Tolerance for identifying lower hull simplices (default is 1e-14).
+    incremental : bool, optional
+        Whether to allow adding points to the hull later with `add_points` (default is False).
+
+    Attributes
+    ----------
+    convex_hull : ConvexHull or None
+        Complete convex hull object, or None for hulls read with `load`.
+    point_compositions : np.ndarray of floats, shape (n_points, n_hull_composition_axes)
+        Compositions of the points the hull was built from, in the coordinates of the hull
+        (see `project_compositions`). The apex of hulls from `lower_envelope_hull` is left out.
+    point_energies : np.ndarray of floats, shape (n_points,)
+        Energies of the points the hull was built from.
+    vertex_indices : np.ndarray of ints, shape (n_vertices,)
+        Indices of points forming the vertices of the lower convex hull.
+    simplex_indices : np.ndarray of ints, shape (n_simplices,)
+        Indices of simplices (within `convex_hull.simplices`) forming the facets of the lower convex hull.
+    simplices : np.ndarray of ints, shape (n_simplices, n_composition_axes + 1)
+        Indices of the points forming each lower hull simplex.
+    equation_matrix : np.ndarray of floats, shape (n_simplices, n_composition_axes + 1)
+        Energy equation of each lower hull simplex (see `simplex_energy_equation_matrix`).
+    hull_vertex_indices : np.ndarray of ints, shape (n_hull_vertices,)
+        Indices of points forming the vertices of the complete convex hull, apart from any apex.
+    bounds : np.ndarray of floats, shape (n_bounds, n_composition_axes + 1), or None
+        Half-spaces bounding the hull in composition space (see `convex_hull_halfspaces`), or None if the hull
+        compositions are degenerate.
+    transforms : np.ndarray of floats, shape (n_simplices, n_composition_axes + 1, n_composition_axes + 1)
+        Barycentric transform of each lower hull simplex in composition space (see `barycentric_transforms`), or NaN for zero volume simplices, which never contain points.
+    neighbors : np.ndarray of ints, shape (n_simplices, n_composition_axes + 1)
+        Lower hull simplex opposite each vertex of each lower hull simplex, or -1 (see `lower_hull_neighbors`).
+    composition_origin, composition_basis : np.ndarray of floats, or None
+        Projection of degenerate compositions onto the hull composition axes (see `full_hull`), or None.
+    tolerance : float
+        Tolerance used for identifying lower hull simplices.
+    """
+
+    def __init__(
+        self,
+        compositions: np.ndarray,
+        energies: np.ndarray,
+        qhull_options: str = None,
+        tolerance: float = 1e-14,
+        incremental: bool = False,
+    ):
+        compositions = _promote_compositions(compositions)
+        self._initialize(
+            full_hull(
+                compositions,
+                energies,
+                qhull_options=qhull_options,
+                incremental=incremental,
+            ),
+            tolerance,
+        )
+
+    @classmethod
+    def from_convex_hull(
+        cls,
+        convex_hull: ConvexHull,
+        tolerance: float = 1e-14,
+        lower_hull_simplex_indices: Sequence[int] = None,
+    ) -> "LowerHull":
+        """Returns a LowerHull using an existing convex hull.
+
+        Parameters
+        ----------
+        convex_hull : ConvexHull
+            Complete convex hull object. Last coordinate of each point is assumed to be energy.
+        tolerance : float, optional
+            Tolerance for identifying lower hull simplices (default is 1e-14).
+        lower_hull_simplex_indices : Sequence[int], optional
+            Indices of lower hull simplices (within `convex_hull.simplices`), if known.
+
+        Returns
+        -------
+        LowerHull
+            Lower hull of `convex_hull`.
+        """
+        lower = cls.__new__(cls)
+        lower._initialize(convex_hull, tolerance, lower_hull_simplex_indices)
+        return lower
+
+    def _initialize(
+        self,
+        convex_hull: ConvexHull,
+        tolerance: float,
+        lower_hull_simplex_indices: Sequence[int] = None,
+    ):
+        self._point_distances = None
+        self._point_simplices = None
+        self.convex_hull = convex_hull
+        self.tolerance = tolerance
+        # Leave out synthetic points added above the data (see `lower_envelope_hull`)
+        n_points = len(convex_hull.points) - getattr(convex_hull, "n_apex_points", 0)
+        self.point_compositions = convex_hull.points[:n_points, :-1]
+        self.point_energies = convex_hull.points[:n_points, -1]
+        if lower_hull_simplex_indices is None:
+            self.vertex_indices, self.simplex_indices = lower_hull(
+                convex_hull, tolerance=tolerance
+            )
+        else:
+            self.simplex_indices = np.asarray(lower_hull_simplex_indices, dtype=int)
+            self.vertex_indices = np.unique(convex_hull.simplices[self.simplex_indices])
+        self.simplices = convex_hull.simplices[self.simplex_indices]
+        self.equation_matrix = simplex_energy_equation_matrix(
+            convex_hull, self.simplex_indices, tolerance=tolerance
+        )
+        self.hull_vertex_indices = convex_hull.vertices[convex_hull.vertices < n_points]
+        self.bounds = convex_hull_halfspaces(
+            self.point_compositions[self.hull_vertex_indices]
+        )
+        self.transforms = barycentric_transforms(
+            self.point_compositions[self.simplices]
+        )
+        self.neighbors = lower_hull_neighbors(convex_hull, self.simplex_indices)
+        self.composition_origin = getattr(convex_hull, "composition_origin", None)
+        self.composition_basis = getattr(convex_hull, "composition_basis", None)
+        self._initialize_point_location()
+
+    def _initialize_point_location(self):
+        self._centroid_tree, self._centroid_simplices = _simplex_centroid_tree(
+            self.point_compositions[self.simplices], self.transforms
+        )
+        if self.point_compositions.shape[1] == 1:
+            self._segment_endpoints = _sorted_segment_endpoints(
+                self.point_compositions[self.simplices]
+            )
+
+    def save(self, directory: str):
+        """Writes the lower hull state to `directory`, such that it can be read with `load` without calling Qhull.
+
+        Each array is written to its own, uniquely named .npy file, so that it can be memory mapped when read. The
+        tolerance and the array files are written to a small JSON manifest, which atomically replaces any previous
+        one once all arrays are written. Files are never overwritten, so processes saving to the same directory at
+        once do not corrupt each other, and hulls already memory mapped from `directory` remain valid after the
+        files of the previous manifest are removed.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to write to. Created if it does not exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        previous_files = _lower_hull_manifest_files(manifest_path)
+        array_files = {}
+        for name in _LOWER_HULL_ARRAYS:
+            if getattr(self, name) is None:
+                continue
+            descriptor, path = tempfile.mkstemp(
+                suffix=".npy", prefix=f"{name}_", dir=directory
+            )
+            with os.fdopen(descriptor, "wb") as f:
+                np.save(f, np.asarray(getattr(self, name)))
+            array_files[name] = os.path.basename(path)
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".tmp", prefix="manifest_", dir=directory
+        )
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(
+                {
+                    "format_version": _LOWER_HULL_FORMAT_VERSION,
+                    "tolerance": self.tolerance,
+                    "arrays": array_files,
+                },
+                f,
+            )
+        os.replace(temporary_path, manifest_path)
+
+        # Processes that already mapped the files of the previous manifest keep their pages
+        for file_name in previous_files - set(array_files.values()):
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "LowerHull":
+        """Reads a lower hull written with `save`.
+
+        The returned hull answers queries without a `convex_hull` (which is None), so points cannot be added to it.
+
+        Parameters
+        ----------
+        directory : str
+            Directory written by `save`.
+        mmap_mode : str, optional
+            Memory mapping mode passed to numpy.load (default is "r", read-only memory mapping, such that processes
+            reading the same hull share one copy). None reads arrays into memory.
+
+        Returns
+        -------
+        LowerHull
+            Lower hull read from `directory`.
+        """
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        if not manifest.get("format_version") == _LOWER_HULL_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported lower hull format version: {manifest.get('format_version')}."
+            )
+        lower = cls.__new__(cls)
+        lower._point_distances = None
+        lower._point_simplices = None
+        lower.convex_hull = None
+        lower.tolerance = manifest["tolerance"]
+        for name in _LOWER_HULL_ARRAYS:
+            setattr(
+                lower,
+                name,
+                (
+                    np.load(
+                        os.path.join(directory, manifest["arrays"][name]),
+                        mmap_mode=mmap_mode,
+                    )
+                    if name in manifest["arrays"]
+                    else None
+                ),
+            )
+        lower._initialize_point_location()
+        return lower
+
+    @property
+    def n_composition_axes(self) -> int:
+        """Number of composition axes of the hull (see `project_compositions`)."""
+        return self.point_compositions.shape[1]
+
+    def inside_bounds(
+        self, compositions: np.ndarray, tolerance: float = 1e-10
+    ) -> np.ndarray:
+        """Returns booleans indicating whether each point in `compositions` is inside the composition bounds of the hull.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points to check. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+        tolerance : float, optional
+            Distance outside of the bounds that is still considered inside (default is 1e-10).
+
+        Returns
+        -------
+        np.ndarray of bools, shape (n_points,)
+            Booleans indicating whether each point is inside the composition bounds.
+        """
+        return self._inside_bounds(self._check_compositions(compositions), tolerance)
+
+    def _inside_bounds(
+        self, compositions: np.ndarray, tolerance: float = 1e-10
+    ) -> np.ndarray:
+        if self.bounds is None:
+            return inside_convex_hull(
+                self.point_compositions[self.hull_vertex_indices], compositions
+            )
+        return np.all(
+            self.bounds[:, :-1] @ compositions.transpose() + self.bounds[:, -1:]
+            <= tolerance,
+            axis=0,
         )
 
-        relevant_simplex_index = relevant_simplex_index[0]
+    def containing_simplex(
+        self, compositions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the lower hull simplices containing the points specified by `compositions`, and the corresponding energies.
+
+        For points incident with multiple simplices, one of the simplices is chosen arbitrarily.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points to find containing simplices for. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+
+        Returns
+        -------
+        simplex_indices : np.ndarray of ints, shape (n_points,)
+            Indices of simplices (within `simplices`) containing each point.
+        energies : np.ndarray of floats, shape (n_points,)
+            Energy values of points specified by `compositions` on their respective simplices.
+        """
+        return self._containing_simplex(self._check_compositions(compositions))
+
+    def _containing_simplex(
+        self, compositions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        self._check_bounds(compositions)
+        return _locate_simplices(
+            compositions,
+            self.equation_matrix,
+            self.point_compositions[self.simplices],
+            neighbors=self.neighbors,
+            transforms=self.transforms,
+            centroid_tree=(self._centroid_tree, self._centroid_simplices),
+            segment_endpoints=getattr(self, "_segment_endpoints", None),
+        )
 
-        # Find vectors defining the corners of the simplex which contains the curent configuration's composition.
-        simplex_corners = compositions[hull.simplices[relevant_simplex_index]]
-        interior_point = np.array(compositions[config_index]).reshape(1, -1)
+    def energies(self, compositions: np.ndarray, chunk_size: int = None) -> np.ndarray:
+        """Returns energies of points in composition space specified by `compositions` along the lower hull.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points to get energies for. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+        chunk_size : int, optional
+            If provided, points are processed in blocks of at most `chunk_size` points. Default is to process all points at once.
+
+        Returns
+        -------
+        np.ndarray of floats, shape (n_points,)
+            Energies of points.
+        """
+        return _evaluate_in_chunks(
+            lambda chunk: self.containing_simplex(chunk)[1], compositions, chunk_size
+        )
 
-        # Find barycentric coordinates of the interior point in composition space
-        weights = barycentric_coordinates(
-            point=interior_point, vertices=simplex_corners
+    def distances(
+        self, compositions: np.ndarray, energies: np.ndarray, chunk_size: int = None
+    ) -> np.ndarray:
+        """Returns hull distances (energy above the lower convex hull) of the points specified by `compositions` and `energies`.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points to get hull distances for. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+        energies : np.ndarray of floats, shape (n_points,)
+            Energies of points to get hull distances for.
+        chunk_size : int, optional
+            If provided, points are processed in blocks of at most `chunk_size` points. Default is to process all points at once.
+
+        Returns
+        -------
+        np.ndarray of floats, shape (n_points,)
+            Hull distances of points.
+        """
+        return energies - self.energies(compositions, chunk_size=chunk_size)
+
+    def decompose(self, compositions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the decomposition of the points specified by `compositions` into lower hull vertices.
+
+        Each point is expressed as a convex combination of the vertices of its containing lower hull simplex,
+        with the barycentric coordinates as fractions.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_points, n_composition_axes)
+            Compositions of points to decompose. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+
+        Returns
+        -------
+        vertex_indices : np.ndarray of ints, shape (n_points, n_composition_axes + 1)
+            Indices of the points (the hull was built from) that each point decomposes into.
+        fractions : np.ndarray of floats, shape (n_points, n_composition_axes + 1)
+            Fraction of each vertex in the decomposition of each point.
+        """
+        compositions = self._check_compositions(compositions)
+        simplex_indices = self._containing_simplex(compositions)[0]
+        point_transforms = self.transforms[simplex_indices]
+        fractions = (
+            np.einsum("nij,nj->ni", point_transforms[:, :, :-1], compositions)
+            + point_transforms[:, :, -1]
+        )
+        return self.simplices[simplex_indices], fractions
+
+    def hull_distances(self) -> np.ndarray:
+        """Returns hull distances of the points the hull was built from.
+
+        The distances are cached. When points are added with `add_points`, only the distances of points whose
+        containing simplex was removed from the lower hull (and of the new points) are recalculated.
+
+        Returns
+        -------
+        np.ndarray of floats, shape (n_points,)
+            Hull distances of the points the hull was built from.
+        """
+        if self._point_distances is None:
+            simplex_indices, hull_energies = self._containing_simplex(
+                self.point_compositions
+            )
+            self._point_distances = self.point_energies - hull_energies
+            self._point_simplices = np.sort(self.simplices[simplex_indices], axis=1)
+        return self._point_distances.copy()
+
+    def add_points(
+        self, compositions: np.ndarray, energies: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Adds points to the hull in place, using Qhull's incremental construction.
+
+        The hull must have been built with `incremental=True`. The convex hull is updated without being rebuilt,
+        and the cached lower hull state is refreshed. New points are appended, so existing point indices are unchanged.
+
+        Parameters
+        ----------
+        compositions : np.ndarray of floats, shape (n_new_points, n_composition_axes)
+            Compositions of points to add. If a 1D array is provided, it is assumed to be a column (multiple points, one composition axis).
+        energies : np.ndarray of floats, shape (n_new_points,)
+            Energies of points to add.
+
+        Returns
+        -------
+        removed_simplices : np.ndarray of ints, shape (n_removed_simplices, n_composition_axes + 1)
+            Point indices (sorted) of simplices that are no longer part of the lower hull.
+        added_simplices : np.ndarray of ints, shape (n_added_simplices, n_composition_axes + 1)
+            Point indices (sorted) of simplices that are new to the lower hull.
+        """
+        if self.convex_hull is None:
+            raise RuntimeError("Cannot add points to a hull read with LowerHull.load.")
+        compositions = self._check_compositions(compositions)
+        n_previous_points = len(self.point_energies)
+        previous_simplices = np.sort(self.simplices, axis=1)
+        point_distances, point_simplices = self._point_distances, self._point_simplices
+
+        self.convex_hull.add_points(
+            np.hstack((compositions, np.asarray(energies, dtype=float)[:, np.newaxis]))
+        )
+        self._initialize(self.convex_hull, self.tolerance)
+
+        current_simplices = np.sort(self.simplices, axis=1)
+        removed_simplices = previous_simplices[
+            ~_rows_in(previous_simplices, current_simplices)
+        ]
+        added_simplices = current_simplices[
+            ~_rows_in(current_simplices, previous_simplices)
+        ]
+
+        # Update cached hull distances for points whose containing simplex was removed, and for new points
+        if point_distances is not None:
+            affected = np.concatenate(
+                (
+                    _rows_in(point_simplices, removed_simplices).nonzero()[0],
+                    np.arange(n_previous_points, len(self.point_energies)),
+                )
+            )
+            simplex_indices, hull_energies = self._containing_simplex(
+                self.point_compositions[affected]
+            )
+            self._point_distances = np.concatenate(
+                (point_distances, np.empty(len(compositions)))
+            )
+            self._point_distances[affected] = (
+                self.point_energies[affected] - hull_energies
+            )
+            self._point_simplices = np.concatenate(
+                (
+                    point_simplices,
+                    np.empty((len(compositions), point_simplices.shape[1]), dtype=int),
+                )
+            )
+            self._point_simplices[affected] = current_simplices[simplex_indices]
+
+        return removed_simplices, added_simplices
+
+    def vertex_depths(self) -> np.ndarray:
+        """Returns how far each lower hull vertex lies below the lower hull formed without it.
+
+        Removing a vertex only changes the lower hull over its star (the union of its incident simplices), and
+        the new facets there can only have vertices among the points whose compositions lie in the star.
+        For each vertex, only those points are hulled, so the cost scales with the size of the star rather than
+        with the number of points. When those points lie in one plane (e.g. the star holds no points besides its
+        link vertices), the hull without the vertex is that plane.
+
+        Returns
+        -------
+        np.ndarray of floats, shape (n_vertices,)
+            Energy of the hull without each vertex (in the order of `vertex_indices`) at the composition of that
+            vertex, minus the energy of the vertex. NaN for vertices whose composition is outside the bounds of the
+            remaining points (e.g. pure components).
+        """
+        # Group points by containing simplex, and simplices by vertex
+        point_simplices = self._containing_simplex(self.point_compositions)[0]
+        point_order = np.argsort(point_simplices)
+        point_bounds = np.searchsorted(
+            point_simplices[point_order], np.arange(len(self.simplices) + 1)
+        )
+        incidence_vertices = self.simplices.ravel()
+        incidence_order = np.argsort(incidence_vertices)
+        incidence_simplices = (
+            np.repeat(np.arange(len(self.simplices)), self.simplices.shape[1])
+        )[incidence_order]
+        incidence_bounds = np.searchsorted(
+            incidence_vertices[incidence_order],
+            np.append(self.vertex_indices, np.iinfo(int).max),
         )
 
-        # Form the hull distance correlations by taking a linear combination of simplex corners.
-        hulldist_corr[config_index] = (
-            corr[config_index] - weights @ corr[hull.simplices[relevant_simplex_index]]
+        depths = np.full(len(self.vertex_indices), np.nan)
+        for position, vertex in enumerate(self.vertex_indices):
+            star = incidence_simplices[
+                incidence_bounds[position] : incidence_bounds[position + 1]
+            ]
+            local_points = np.unique(
+                np.concatenate(
+                    [self.simplices[star].ravel()]
+                    + [
+                        point_order[point_bounds[simplex] : point_bounds[simplex + 1]]
+                        for simplex in star
+                    ]
+                )
+            )
+            local_points = local_points[local_points != vertex]
+            vertex_composition = self.point_compositions[vertex : vertex + 1]
+            local_compositions = self.point_compositions[local_points]
+            local_energies = self.point_energies[local_points]
+            if not inside_convex_hull(local_compositions, vertex_composition)[0]:
+                continue
+
+            # If the remaining points of the star lie in one plane (e.g. the star holds only the link
+            # vertices), the hull without the vertex is that plane, and the points have no full dimensional hull
+            centered_points = np.column_stack(
+                (local_compositions, local_energies)
+            ) - np.append(local_compositions[0], local_energies[0])
+            singular_values = np.linalg.svd(centered_points, compute_uv=False)
+            if (
+                np.sum(singular_values > 1e-10 * max(1.0, singular_values[0]))
+                <= self.n_composition_axes
+            ):
+                plane = np.linalg.lstsq(
+                    np.column_stack((local_compositions, np.ones(len(local_points)))),
+                    local_energies,
+                    rcond=None,
+                )[0]
+                local_energy = vertex_composition[0] @ plane[:-1] + plane[-1]
+            else:
+                local_hull = LowerHull.from_convex_hull(
+                    _full_hull(local_compositions, local_energies), self.tolerance
+                )
+                if not local_hull.inside_bounds(vertex_composition)[0]:
+                    continue
+                local_energy = local_hull.energies(vertex_composition)[0]
+            depths[position] = local_energy - self.point_energies[vertex]
+        return depths
+
+    def _check_compositions(self, compositions: np.ndarray) -> np.ndarray:
+        compositions = _project_compositions(
+            compositions, self.composition_origin, self.composition_basis
         )
+        if not compositions.shape[1] == self.n_composition_axes:
+            raise ValueError(
+                f"Composition dimensions of input points and hull points differ: {compositions.shape[1]} vs {self.n_composition_axes}."
+            )
+        return compositions
+
+    def _check_bounds(self, compositions: np.ndarray):
+        out_of_bounds_point_indices = (~self._inside_bounds(compositions)).nonzero()[0]
+        if not out_of_bounds_point_indices.size == 0:
+            raise ValueError(
+                f"Point outside of hull composition bounds encountered: Point index {','.join(map(str, out_of_bounds_point_indices))}."
+            )
+
+
+_LOWER_HULL_FORMAT_VERSION = 2
+
+
+def _lower_hull_manifest_files(manifest_path: str) -> set:
+    """Returns the names of the array files listed in the manifest at `manifest_path`, or an empty set if there is none."""
+    try:
+        with open(manifest_path) as f:
+            return set(json.load(f)["arrays"].values())
+    except (OSError, ValueError, KeyError, AttributeError):
+        return set()
+
+
+_LOWER_HULL_ARRAYS = [
+    "point_compositions",
+    "point_energies",
+    "vertex_indices",
+    "simplex_indices",
+    "simplices",
+    "equation_matrix",
+    "hull_vertex_indices",
+    "bounds",
+    "transforms",
+    "neighbors",
+    "composition_origin",
+    "composition_basis",
+]
+
+
+def _rows_in(rows: np.ndarray, reference_rows: np.ndarray) -> np.ndarray:
+    """Returns booleans indicating whether each row of the 2D integer array `rows` is also a row of `reference_rows`."""
+    rows = np.ascontiguousarray(rows)
+    reference_rows = np.ascontiguousarray(reference_rows, dtype=rows.dtype).reshape(
+        -1, rows.shape[1]
+    )
+    row_dtype = np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))
+    return np.isin(rows.view(row_dtype).ravel(), reference_rows.view(row_dtype).ravel())
 
-    return hulldist_corr
+
+def _promote_compositions(compositions: np.ndarray) -> np.ndarray:
+    """Returns `compositions` as a 2D array, treating a 1D array as a column (multiple points, one composition axis)."""
+    compositions = np.asarray(compositions, dtype=float)
+    if compositions.ndim == 1:
+        compositions = compositions[:, np.newaxis]
+    return compositions
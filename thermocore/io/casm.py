@@ -1,7 +1,15 @@
 from __future__ import annotations
 import numpy as np
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Optional, Tuple
 import copy
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
 
 
 def regroup_query_by_config_property(casm_query_json_data: list) -> dict:
@@ -53,6 +61,732 @@ def regroup_query_by_config_property(casm_query_json_data: list) -> dict:
     return results
 
 
+def read_query_columns(
+    path: str,
+    dtype: np.dtype = np.float64,
+    n_configurations: Optional[int] = None,
+    chunk_size: int = 2**20,
+    columns: Optional[Sequence[str]] = None,
+    return_masks: bool = False,
+):
+    """Reads a CASM query json file into one NumPy array per property, parsing one configuration at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path to a json file written by casm query.
+    dtype : np.dtype, optional
+        Floating point type of float and array properties (default is np.float64).
+    n_configurations : int, optional
+        Expected number of configurations. Columns are preallocated to this size if given, and grown as needed
+        otherwise.
+    chunk_size : int, optional
+        Number of characters read from the file at a time (default is 2**20).
+    columns : Sequence[str], optional
+        Properties to read, for example ["name", "comp", "corr", "formation_energy"]. Other properties are
+        skipped without being decoded. Default is None, reading all properties.
+    return_masks : bool, optional
+        Whether to also return masks of the configurations in which each property is present (default is False).
+
+    Returns
+    -------
+    columns : dict
+        Dictionary of arrays grouped by keys, with one row per configuration. Array properties such as "comp"
+        and "corr" are flattened to rank 2 matrices, numbers to vectors and strings to string arrays.
+        Configurations missing a property hold NaN (floats), 0 (integers and booleans), "" (strings) or None in
+        its column.
+    masks : dict
+        Boolean arrays of the configurations in which each property is present, for properties missing from some
+        configurations. Only returned if `return_masks` is True.
+
+    Notes
+    -----
+    Unlike `regroup_query_by_config_property`, the file is never held in memory as a list of dictionaries, so
+    peak memory is close to the size of the returned arrays. Configurations need not share the same keys.
+    """
+    with open(path) as f:
+        query_columns, masks = _build_query_columns(
+            _iter_json_array(f, chunk_size, columns), dtype, n_configurations, columns
+        )
+    if return_masks:
+        return query_columns, masks
+    return query_columns
+
+
+class QueryTable:
+    """Columnar CASM query data, with one typed NumPy array per property and one row per configuration.
+
+    Parameters
+    ----------
+    columns : dict
+        Arrays grouped by property name, all with the same number of rows (see `read_query_columns`).
+    masks : dict, optional
+        Boolean arrays of the rows in which each property is present, for properties missing from some rows.
+
+    Attributes
+    ----------
+    columns : dict
+        Arrays grouped by property name. Indexing the table with a property name returns these arrays without
+        copying them.
+    masks : dict
+        Boolean arrays of the rows in which each property is present, for properties missing from some rows.
+    """
+
+    def __init__(self, columns: dict, masks: Optional[dict] = None):
+        self.columns = {key: np.asanyarray(column) for key, column in columns.items()}
+        self.masks = {key: np.asanyarray(mask) for key, mask in (masks or {}).items()}
+        if (
+            len(
+                {len(column) for column in self.columns.values()}
+                | {len(mask) for mask in self.masks.values()}
+            )
+            > 1
+        ):
+            raise ValueError(
+                "All query table columns must have the same number of rows."
+            )
+        self._name_index = None
+
+    @classmethod
+    def read(
+        cls,
+        path: str,
+        dtype: np.dtype = np.float64,
+        n_configurations: Optional[int] = None,
+        chunk_size: int = 2**20,
+        columns: Optional[Sequence[str]] = None,
+        cache: bool = False,
+        validate: str = "stat",
+        mmap_mode: Optional[str] = "r",
+    ) -> QueryTable:
+        """Reads a CASM query json file into a table (see `read_query_columns`).
+
+        Parameters
+        ----------
+        path : str
+            Path to a json file written by casm query.
+        dtype : np.dtype, optional
+            Floating point type of float and array properties (default is np.float64).
+        n_configurations : int, optional
+            Expected number of configurations, used to preallocate columns.
+        chunk_size : int, optional
+            Number of characters read from the file at a time (default is 2**20).
+        columns : Sequence[str], optional
+            Properties to read, skipping all others (default is None, reading all properties).
+        cache : bool, optional
+            Whether to read and write a parsed copy of the table in the directory `path` + ".cache" (default is
+            False). The cache is rewritten whenever it does not match the source file, `dtype` or `columns`.
+        validate : str, optional
+            How a cache is matched to its source file: "stat" compares the file size and modification time
+            (default), "hash" compares the file size and a hash of its contents, which also survives copying.
+        mmap_mode : str, optional
+            Memory mapping mode of cached columns (see `load`, default is "r").
+
+        Returns
+        -------
+        QueryTable
+            Table of the query data in `path`.
+        """
+        if not cache:
+            return cls(
+                *read_query_columns(
+                    path, dtype, n_configurations, chunk_size, columns, True
+                )
+            )
+        directory = f"{path}.cache"
+        signature = _query_source_signature(path, validate)
+        signature["dtype"] = np.dtype(dtype).str
+        signature["columns"] = None if columns is None else list(columns)
+        try:
+            with open(os.path.join(directory, "manifest.json")) as f:
+                cached = json.load(f)["source"] == signature
+        except (OSError, ValueError, KeyError):
+            cached = False
+        if cached:
+            try:
+                return cls.load(directory, mmap_mode)
+            except (OSError, ValueError, KeyError):
+                # Cache was replaced by another process while being read
+                pass
+        table = cls(
+            *read_query_columns(
+                path, dtype, n_configurations, chunk_size, columns, True
+            )
+        )
+        table.save(directory, source=signature)
+        try:
+            return cls.load(directory, mmap_mode)
+        except (OSError, ValueError, KeyError):
+            return table
+
+    def save(self, directory: str, source: Optional[dict] = None):
+        """Writes the table to `directory`, such that it can be read with `load` without parsing json.
+
+        Each column is written to its own, uniquely named .npy file, so that it can be memory mapped when read.
+        Column names and files are written to a small JSON manifest, which atomically replaces any previous one
+        once all columns are written. Files are never overwritten, so processes saving to the same directory at
+        once do not corrupt each other, and tables already memory mapped from `directory` remain valid after the
+        files of the previous manifest are removed.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to write to. Created if it does not exist.
+        source : dict, optional
+            Description of the source of the table, stored in the manifest.
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        previous_files = _manifest_files(manifest_path)
+        manifest = {
+            "format_version": _QUERY_TABLE_FORMAT_VERSION,
+            "source": source,
+            "columns": {},
+            "masks": {},
+        }
+        for group, arrays in (("columns", self.columns), ("masks", self.masks)):
+            for index, (key, array) in enumerate(arrays.items()):
+                descriptor, file_path = tempfile.mkstemp(
+                    suffix=".npy", prefix=f"{group}_{index}_", dir=directory
+                )
+                with os.fdopen(descriptor, "wb") as f:
+                    np.save(f, array, allow_pickle=array.dtype.hasobject)
+                manifest[group][key] = os.path.basename(file_path)
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".tmp", prefix="manifest_", dir=directory
+        )
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(manifest, f)
+        os.replace(temporary_path, manifest_path)
+
+        # Processes that already mapped the files of the previous manifest keep their pages
+        for file_name in previous_files - set(_manifest_files(manifest_path)):
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> QueryTable:
+        """Reads a table written with `save`.
+
+        Parameters
+        ----------
+        directory : str
+            Directory written by `save`.
+        mmap_mode : str, optional
+            Memory mapping mode passed to numpy.load (default is "r", read-only memory mapping, such that processes
+            reading the same table share one copy). None reads columns into memory. Columns of Python objects
+            (properties that are neither numbers, strings nor numeric arrays) are always read into memory.
+
+        Returns
+        -------
+        QueryTable
+            Table read from `directory`.
+        """
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        if not manifest.get("format_version") == _QUERY_TABLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported query table format version: {manifest.get('format_version')}."
+            )
+        arrays = {"columns": {}, "masks": {}}
+        for group, group_arrays in arrays.items():
+            for key, file_name in manifest[group].items():
+                try:
+                    group_arrays[key] = np.load(
+                        os.path.join(directory, file_name), mmap_mode=mmap_mode
+                    )
+                except ValueError:
+                    # Object columns cannot be memory mapped
+                    group_arrays[key] = np.load(
+                        os.path.join(directory, file_name), allow_pickle=True
+                    )
+        return cls(arrays["columns"], arrays["masks"])
+
+    @classmethod
+    def from_query_data(
+        cls,
+        casm_query_json_data: list,
+        dtype: np.dtype = np.float64,
+        columns: Optional[Sequence[str]] = None,
+    ) -> QueryTable:
+        """Returns a table of CASM query data already read as a list of dictionaries, keeping only `columns` if given."""
+        return cls(
+            *_build_query_columns(
+                casm_query_json_data, dtype, len(casm_query_json_data), columns
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.columns
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, (int, np.integer)) and not isinstance(key, (bool, np.bool_)):
+            return self.row(key)
+        return self.subset(key)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def subset(self, rows) -> QueryTable:
+        """Returns a table of the rows selected by `rows`.
+
+        Parameters
+        ----------
+        rows : slice, np.ndarray of bools, shape (n_rows,), or Sequence[int]
+            Row mask, row indices or slice. Slices return views of the columns.
+
+        Returns
+        -------
+        QueryTable
+            Table of the selected rows.
+        """
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows)
+            if rows.ndim == 0:
+                raise TypeError(
+                    "Rows must be a slice, mask or sequence of indices; use row() for a single row."
+                )
+        return QueryTable(
+            {key: column[rows] for key, column in self.columns.items()},
+            {key: mask[rows] for key, mask in self.masks.items()},
+        )
+
+    def row(self, index: int) -> dict:
+        """Returns the properties of the configuration in row `index`, as a dictionary of Python values.
+
+        Array properties are returned as flat lists (as stored in the columns), and missing properties are omitted.
+        """
+        values = {}
+        for key, column in self.columns.items():
+            if key in self.masks and not self.masks[key][index]:
+                continue
+            value = column[index]
+            values[key] = (
+                value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value
+            )
+        return values
+
+    @property
+    def name_index(self) -> dict:
+        """Dictionary of row indices by configuration name."""
+        if self._name_index is None:
+            self._name_index = {
+                name: row for row, name in enumerate(self.columns["name"].tolist())
+            }
+        return self._name_index
+
+    def rows(self, names: Sequence) -> np.ndarray:
+        """Returns the row indices of configurations `names`, raising KeyError for unknown names."""
+        return np.array([self.name_index[name] for name in names], dtype=int)
+
+    def present(self, key: str) -> np.ndarray:
+        """Returns a boolean array of the rows in which property `key` is present."""
+        if key in self.masks:
+            return self.masks[key]
+        return np.ones(len(self.columns[key]), dtype=bool)
+
+    def to_dict(self) -> dict:
+        """Returns the table as a dictionary of lists, as returned by `regroup_query_by_config_property`.
+
+        Values of properties missing from a row are None.
+        """
+        results = {key: column.tolist() for key, column in self.columns.items()}
+        for key, mask in self.masks.items():
+            for row in np.flatnonzero(~mask):
+                results[key][row] = None
+        return results
+
+
+def read_query_tables(
+    paths: Sequence[str],
+    dtype: np.dtype = np.float64,
+    columns: Optional[Sequence[str]] = None,
+    n_workers: Optional[int] = None,
+    source_column: Optional[str] = None,
+    deduplicate: bool = True,
+    chunk_size: int = 2**20,
+    cache: bool = False,
+    validate: str = "stat",
+) -> QueryTable:
+    """Reads many CASM query json files (for example one per calctype or supercell batch) into one table.
+
+    Parameters
+    ----------
+    paths : Sequence[str]
+        Paths to json files written by casm query.
+    dtype : np.dtype, optional
+        Floating point type of float and array properties (default is np.float64).
+    columns : Sequence[str], optional
+        Properties to read, skipping all others (default is None, reading all properties).
+    n_workers : int, optional
+        Number of processes to read files with. Default is to read all files in the current process.
+    source_column : str, optional
+        Name of a column holding the path of the file each configuration was read from. Default is None, adding
+        no such column.
+    deduplicate : bool, optional
+        Whether to keep only the first configuration of each name, in the order of `paths` (default is True).
+        Configurations without a name are always kept.
+    chunk_size : int, optional
+        Number of characters read from each file at a time (default is 2**20).
+    cache : bool, optional
+        Whether to use and write a parsed copy of each file (see `QueryTable.read`, default is False).
+    validate : str, optional
+        How caches are matched to their source files (see `QueryTable.read`, default is "stat").
+
+    Returns
+    -------
+    QueryTable
+        Table of all configurations in `paths`. Properties missing from some files are masked in those rows.
+    """
+    read = functools.partial(
+        QueryTable.read,
+        dtype=dtype,
+        chunk_size=chunk_size,
+        columns=columns,
+        cache=cache,
+        validate=validate,
+        mmap_mode=None,
+    )
+    paths = [str(path) for path in paths]
+    if n_workers is None or n_workers == 1:
+        tables = [read(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            tables = list(executor.map(read, paths))
+
+    if source_column is not None:
+        for path, table in zip(paths, tables):
+            table.columns[source_column] = np.full(len(table), path)
+    table = _concatenate_query_tables(tables, paths)
+    if deduplicate and "name" in table:
+        named = table.present("name")
+        _, first_rows = np.unique(table["name"][named], return_index=True)
+        keep = ~named
+        keep[np.flatnonzero(named)[first_rows]] = True
+        if not keep.all():
+            table = table[keep]
+    return table
+
+
+def _concatenate_query_tables(tables: Sequence[QueryTable], paths: Sequence[str]):
+    """Returns the rows of `tables` in one table, masking properties missing from some tables.
+
+    A property missing from every row of a table (e.g. a projected column the file never contains) is treated
+    as absent from that table, rather than as data of its placeholder column.
+    """
+    keys = list(dict.fromkeys(key for table in tables for key in table.keys()))
+    columns, masks = {}, {}
+    for key in keys:
+        has_key = [key in table and table.present(key).any() for table in tables]
+        reference = next(
+            (table[key] for table, has in zip(tables, has_key) if has),
+            next(table[key] for table in tables if key in table),
+        )
+        parts, present = [], []
+        for path, table, has in zip(paths, tables, has_key):
+            if has:
+                if table[key].shape[1:] != reference.shape[1:]:
+                    raise ValueError(
+                        f"Shapes of {key!r} differ between query files: {table[key].shape[1:]} in {path} vs {reference.shape[1:]}."
+                    )
+                parts.append(table[key])
+                present.append(table.present(key))
+            else:
+                parts.append(_missing_values(reference, len(table)))
+                present.append(np.zeros(len(table), dtype=bool))
+        columns[key] = np.concatenate(parts)
+        present = np.concatenate(present)
+        if not present.all():
+            masks[key] = present
+    return QueryTable(columns, masks)
+
+
+def _missing_values(reference: np.ndarray, n_rows: int) -> np.ndarray:
+    """Returns `n_rows` missing values for a column like `reference` (see `read_query_columns`)."""
+    shape = (n_rows,) + reference.shape[1:]
+    if reference.dtype.kind == "f":
+        return np.full(shape, np.nan, dtype=reference.dtype)
+    if reference.dtype.kind == "O":
+        return np.full(shape, None, dtype=object)
+    return np.zeros(shape, dtype=reference.dtype)
+
+
+_QUERY_TABLE_FORMAT_VERSION = 2
+
+
+def _manifest_files(manifest_path: str) -> set:
+    """Returns the names of the files listed in the manifest at `manifest_path`, or an empty set if there is none."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return {
+            file_name
+            for group in ("columns", "masks")
+            for file_name in manifest[group].values()
+        }
+    except (OSError, ValueError, KeyError, AttributeError):
+        return set()
+
+
+def _query_source_signature(path: str, validate: str) -> dict:
+    """Returns the size and either the modification time or the content hash of file `path`."""
+    if validate == "stat":
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if validate == "hash":
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(2**24), b""):
+                digest.update(block)
+        return {"size": os.path.getsize(path), "blake2b": digest.hexdigest()}
+    raise ValueError(f'validate must be "stat" or "hash", not {validate!r}.')
+
+
+def _build_query_columns(
+    records: Iterable,
+    dtype: np.dtype,
+    n_configurations: Optional[int],
+    columns: Optional[Sequence[str]] = None,
+) -> Tuple[dict, dict]:
+    """Returns `records` (configuration dictionaries) grouped into arrays by key, and masks of present keys (see `read_query_columns`)."""
+    capacity = n_configurations or 1024
+    if columns is None:
+        builders = {}
+    else:
+        builders = {key: _ColumnBuilder(dtype, capacity) for key in columns}
+    n_rows = 0
+    for record in records:
+        if columns is None:
+            for key in record:
+                if key not in builders:
+                    builders[key] = _ColumnBuilder(dtype, capacity, n_rows)
+        for key, builder in builders.items():
+            if key in record:
+                builder.append(record[key])
+            else:
+                builder.append_missing()
+        n_rows += 1
+    query_columns, masks = {}, {}
+    for key, builder in builders.items():
+        query_columns[key] = builder.finish()
+        if builder.missing_rows:
+            masks[key] = np.ones(n_rows, dtype=bool)
+            masks[key][builder.missing_rows] = False
+    return query_columns, masks
+
+
+class _ColumnBuilder:
+    """Growable column of per-configuration values.
+
+    The type of the column is set by the first value: integers and floats are stored in vectors, nested lists
+    of numbers in matrices with one flattened row per value, and anything else in a list. Integer columns are
+    promoted to floats when a float is appended, and numeric columns fall back to a list when a value does not
+    fit (e.g. an array of a different length, or an integer beyond 64 bits). Earlier array values then become flat
+    lists. Missing values are filled with NaN, 0, "" or None, and their rows recorded in `missing_rows`.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity: int, n_missing: int = 0):
+        self.dtype = dtype
+        self.capacity = capacity
+        self.values = None
+        self.n_rows = n_missing
+        self.missing_rows = list(range(n_missing))
+
+    def append(self, value):
+        if self.values is None:
+            self.values = self._allocate(value)
+        if isinstance(self.values, np.ndarray):
+            try:
+                self._append_numeric(value)
+                return
+            except (TypeError, ValueError, OverflowError):
+                # Earlier array values are kept as flat lists
+                self.values = self.values[: self.n_rows].tolist()
+                for row in self.missing_rows:
+                    self.values[row] = None
+        self.values.append(value)
+        self.n_rows += 1
+
+    def append_missing(self):
+        self.missing_rows.append(self.n_rows)
+        if isinstance(self.values, np.ndarray):
+            self._grow()
+            self.values[self.n_rows] = np.nan if self.values.dtype.kind == "f" else 0
+        elif self.values is not None:
+            self.values.append(None)
+        self.n_rows += 1
+
+    def finish(self) -> np.ndarray:
+        if self.values is None:
+            return np.full(self.n_rows, np.nan, dtype=self.dtype)
+        if isinstance(self.values, np.ndarray):
+            self.values.resize((self.n_rows,) + self.values.shape[1:], refcheck=False)
+            return self.values
+        missing_rows = set(self.missing_rows)
+        if all(
+            isinstance(value, str) or row in missing_rows
+            for row, value in enumerate(self.values)
+        ):
+            for row in missing_rows:
+                self.values[row] = ""
+            return np.array(self.values, dtype=str)
+        column = np.empty(len(self.values), dtype=object)
+        for row, value in enumerate(self.values):
+            column[row] = value
+        return column
+
+    def _allocate(self, value):
+        capacity = max(self.capacity, 2 * self.n_rows)
+        if isinstance(value, bool):
+            return np.zeros(capacity, dtype=bool)
+        if isinstance(value, int):
+            return np.zeros(capacity, dtype=np.int64)
+        if isinstance(value, float):
+            return np.full(capacity, np.nan, dtype=self.dtype)
+        if isinstance(value, list):
+            try:
+                row = np.asarray(value, dtype=self.dtype).ravel()
+            except (TypeError, ValueError):
+                return [None] * self.n_rows
+            return np.full((capacity, len(row)), np.nan, dtype=self.dtype)
+        return [None] * self.n_rows
+
+    def _append_numeric(self, value):
+        if self.values.ndim == 2:
+            value = np.asarray(value, dtype=self.dtype).ravel()
+            if not value.size == self.values.shape[1]:
+                raise ValueError(
+                    f"Cannot store {value.size} values in a column of width {self.values.shape[1]}."
+                )
+        elif not isinstance(value, (bool, int, float)) or (
+            isinstance(value, bool) != (self.values.dtype == bool)
+        ):
+            raise TypeError(f"Cannot store {value!r} in a numeric column.")
+        elif isinstance(value, float) and self.values.dtype.kind == "i":
+            self.values = self.values.astype(self.dtype)
+            self.values[self.missing_rows] = np.nan
+        self._grow()
+        self.values[self.n_rows] = value
+        self.n_rows += 1
+
+    def _grow(self):
+        if self.n_rows == len(self.values):
+            self.values.resize(
+                (2 * len(self.values),) + self.values.shape[1:], refcheck=False
+            )
+
+
+_JSON_SEPARATORS = re.compile(r"[\s,]*")
+_JSON_WHITESPACE = re.compile(r"\s*")
+_JSON_COLON = re.compile(r"\s*:\s*")
+_JSON_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_JSON_SCALAR = re.compile(r"[^\s,\]}]*")
+_JSON_TOKENS = re.compile(r'["\[\]{}]')
+
+
+def _iter_json_array(
+    f: IO, chunk_size: int, keys: Optional[Sequence[str]] = None
+) -> Iterator:
+    """Yields the elements of the json array in file `f`, reading `chunk_size` characters at a time.
+
+    If `keys` is given, elements must be objects, and only the values of `keys` are decoded.
+    """
+    decoder = json.JSONDecoder()
+    if keys is not None:
+        keys = set(keys)
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("CASM query json data must be a list of configurations.")
+    position = 1
+    while True:
+        position = _JSON_SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            if keys is None:
+                element, position = decoder.raw_decode(buffer, position)
+            else:
+                element, position = _decode_json_object(buffer, position, keys, decoder)
+        except json.JSONDecodeError:
+            # Element is incomplete: read more, at least doubling the buffer for very large elements
+            more = f.read(max(chunk_size, len(buffer) - position))
+            if not more:
+                raise
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield element
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+def _decode_json_object(
+    buffer: str, position: int, keys: set, decoder: json.JSONDecoder
+) -> Tuple[dict, int]:
+    """Returns the values of `keys` in the json object starting at `position` in `buffer`, and the end of the object.
+
+    Raises json.JSONDecodeError if the object is malformed or ends after the end of `buffer`.
+    """
+    if not buffer.startswith("{", position):
+        raise json.JSONDecodeError("Expecting object", buffer, position)
+    element = {}
+    position = _JSON_WHITESPACE.match(buffer, position + 1).end()
+    if buffer.startswith("}", position):
+        return element, position + 1
+    while True:
+        key, position = decoder.raw_decode(buffer, position)
+        colon = _JSON_COLON.match(buffer, position)
+        if colon is None or colon.end() == len(buffer):
+            raise json.JSONDecodeError("Expecting ':' delimiter", buffer, position)
+        if key in keys:
+            element[key], position = decoder.raw_decode(buffer, colon.end())
+        else:
+            position = _skip_json_value(buffer, colon.end())
+        position = _JSON_WHITESPACE.match(buffer, position).end()
+        if buffer.startswith("}", position):
+            return element, position + 1
+        if not buffer.startswith(",", position):
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+        position = _JSON_WHITESPACE.match(buffer, position + 1).end()
+
+
+def _skip_json_value(buffer: str, position: int) -> int:
+    """Returns the end of the json value starting at `position` in `buffer`, without decoding it."""
+    if buffer.startswith('"', position):
+        string = _JSON_STRING.match(buffer, position)
+        if string is None:
+            raise json.JSONDecodeError("Unterminated string", buffer, position)
+        return string.end()
+    if not buffer.startswith(("[", "{"), position):
+        end = _JSON_SCALAR.match(buffer, position).end()
+        if end == len(buffer):
+            raise json.JSONDecodeError("Unterminated value", buffer, position)
+        return end
+    depth = 0
+    while True:
+        token = _JSON_TOKENS.search(buffer, position)
+        if token is None:
+            raise json.JSONDecodeError("Unterminated value", buffer, position)
+        if token.group() == '"':
+            string = _JSON_STRING.match(buffer, token.start())
+            if string is None:
+                raise json.JSONDecodeError("Unterminated string", buffer, position)
+            position = string.end()
+            continue
+        depth += 1 if token.group() in "[{" else -1
+        position = token.end()
+        if depth == 0:
+            return position
+
+
 def pull_ecis_from_json(eci_json: dict) -> list:
     """Returns a list of ECIs from a CASMv1.2.0 eci.json file.
     Can specify specific linear function indices of interest.